@@ -40,10 +40,19 @@
 
 import itertools
 import sys
-import win32com.client.gencache
-import win32com.client.selecttlb
-import word
-__all__ = ["word"]
+# Modules not driving office, like trace replaying, are usable without
+# COM support.
+try:
+    import win32com.client.gencache
+    import win32com.client.selecttlb
+except ImportError:
+    _COM_SUPPORT = False
+else:
+
+    _COM_SUPPORT = True
+    import word
+
+__all__ = ["word"] if _COM_SUPPORT else []
 
 def _init():
     """Initialize office-wide and application type libraries."""
@@ -70,4 +79,5 @@ def _init():
                 tlbs[cur_tlb].clsid, tlbs[cur_tlb].lcid, int(tlbs[
                 cur_tlb].major), int(tlbs[cur_tlb].minor)).constants
 
-_init()
+if _COM_SUPPORT:
+    _init()
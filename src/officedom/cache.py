@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+"""caches conversion results by content"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         cache.py
+#
+# function:     conversion result cache
+#
+# description:  stores converted documents on disk keyed by the hash of
+#               their input content and conversion settings, evicting
+#               least recently used entries beyond a size limit
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import collections
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+# size of file blocks read for hashing
+_BLOCK_SIZE = 1 << 20
+
+class ConversionCache(object):
+
+    """Disk cache of conversion results
+
+    Entries are keyed by the hash of the input file content, the target
+    format and the settings applied during conversion, so identical
+    inputs are converted only once regardless of their paths. The cache
+    directory may be reused across runs; entries are ordered by their
+    modification times upon creating the cache.
+
+    """
+
+    def __init__(self, cache_dir, max_size):
+        """Create a conversion cache.
+
+        `self` is this conversion cache.
+        `cache_dir` is the directory to store cached results in.
+        `max_size` is the maximum total size in bytes of cached results.
+
+        """
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+
+        self._dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # entry sizes by key from the least recently used
+        self._entries = collections.OrderedDict()
+        entries = []
+
+        for cur_file in os.listdir(cache_dir):
+
+            cur_path = os.path.join(cache_dir, cur_file)
+
+            # Skip partially stored entries.
+            if os.path.isfile(cur_path) and not cur_file.startswith("."):
+
+                stat = os.stat(cur_path)
+                entries.append((stat.st_mtime, cur_file, stat.st_size))
+
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+
+        self._size = sum(self._entries.itervalues())
+
+    def get(self, key, out_file):
+        """Copy the cached result of the given key to a file.
+
+        `self` is this conversion cache.
+        `key` is the cache key of the conversion.
+        `out_file` is the path to copy the cached result to.
+        The method returns whether the result was cached.
+
+        """
+        with self._lock:
+
+            if key not in self._entries:
+
+                self.misses += 1
+                return False
+
+            self._entries[key] = self._entries.pop(key)
+            self.hits += 1
+            # Copy before concurrent stores can evict the entry.
+            cached_file = os.path.join(self._dir, key)
+            shutil.copyfile(cached_file, out_file)
+            os.utime(cached_file, None)
+
+        return True
+
+    @staticmethod
+    def get_key(in_file, file_format, settings=None):
+        """Return the cache key of the given conversion.
+
+        `in_file` is the path of the input file.
+        `file_format` is the target file format.
+        `settings` is the mapping of document snapshot fields to values
+                   applied during conversion, None if no settings are
+                   applied.
+
+        """
+        digest = hashlib.sha1()
+
+        with open(in_file, "rb") as in_stream:
+            for block in iter(lambda: in_stream.read(_BLOCK_SIZE), ""):
+                digest.update(block)
+
+        digest.update("\0" + json.dumps(
+            [file_format, settings or {}], sort_keys=True))
+        return digest.hexdigest()
+
+    def put(self, key, out_file):
+        """Store the given conversion result.
+
+        `self` is this conversion cache.
+        `key` is the cache key of the conversion.
+        `out_file` is the path of the conversion result.
+        Results larger than the cache size aren't stored.
+
+        """
+        size = os.path.getsize(out_file)
+
+        if size > self.max_size:
+            return
+
+        handle, tmp_file = tempfile.mkstemp(prefix=".", dir=self._dir)
+        os.close(handle)
+        shutil.copyfile(out_file, tmp_file)
+        cached_file = os.path.join(self._dir, key)
+
+        with self._lock:
+
+            self._discard(key)
+            os.rename(tmp_file, cached_file)
+            self._entries[key] = size
+            self._size += size
+
+            while self._size > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        """Remove the given entry if cached.
+
+        `self` is this conversion cache.
+        `key` is the cache key of the entry to remove.
+
+        """
+        if key in self._entries:
+
+            self._size -= self._entries.pop(key)
+            os.remove(os.path.join(self._dir, key))
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+"""serializes lightweight objects"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         codec.py
+#
+# function:     lightweight object serialization
+#
+# description:  encodes and decodes lightweight objects in compact
+#               binary and JSON formats
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+from cStringIO import StringIO
+import json
+import struct
+import types
+FORMAT_VERSION = 1
+_MAGIC = "ODLO"
+_HEADER_FMT = struct.Struct("<4sB")
+# value type codes
+_NONE = "N"
+_TRUE = "T"
+_FALSE = "F"
+_INT = "i"
+_FLOAT = "f"
+_STR = "s"
+_UNICODE = "u"
+_DICT = "d"
+_LIST = "l"
+_TUPLE = "t"
+_INT_FMT = struct.Struct("<q")
+_FLOAT_FMT = struct.Struct("<d")
+_LEN_FMT = struct.Struct("<I")
+_VERSION_FMT = struct.Struct("<B")
+# JSON key for dictionaries with non-string keys or holding this key
+_ITEMS_KEY = "__items__"
+# registered classes by tag
+_classes = {}
+# registered tags by class
+_tags = {}
+
+def dump(obj, stream):
+    """Write the given object to a binary stream.
+
+    `obj` is the lightweight object to write.
+    `stream` is the binary stream to write to.
+    The object state is written piece by piece, so large dictionaries
+    aren't copied while being encoded.
+
+    """
+    version, state = obj.__getstate__()
+    stream.write(_HEADER_FMT.pack(_MAGIC, FORMAT_VERSION))
+    _write_str(stream, _tags[obj.__class__])
+    stream.write(_VERSION_FMT.pack(version))
+    _write_value(stream, state)
+
+def dumps(obj):
+    """Return the binary encoding of the given object.
+
+    `obj` is the lightweight object to encode.
+
+    """
+    stream = StringIO()
+    dump(obj, stream)
+    return stream.getvalue()
+
+def from_json(data):
+    """Return the object decoded from the given JSON string.
+
+    `data` is the JSON string to decode.
+
+    """
+    doc = json.loads(data, object_hook=_json_dict)
+
+    if doc["format"] != FORMAT_VERSION:
+        raise ValueError("unsupported format version")
+
+    # Attribute names are decoded as unicode strings.
+    return _restore(doc["type"], doc["version"], dict(
+        (str(key), val) for key, val in doc["state"].iteritems()))
+
+def load(stream):
+    """Read an object from a binary stream.
+
+    `stream` is the binary stream to read from.
+
+    """
+    magic, version = _HEADER_FMT.unpack(stream.read(_HEADER_FMT.size))
+
+    if magic != _MAGIC or version != FORMAT_VERSION:
+        raise ValueError("unsupported format")
+
+    tag = _read_value(stream, _STR)
+    state_version = _VERSION_FMT.unpack(stream.read(_VERSION_FMT.size))[0]
+    return _restore(tag, state_version, _read_value(stream))
+
+def loads(data):
+    """Return the object decoded from the given binary string.
+
+    `data` is the binary string to decode.
+
+    """
+    return load(StringIO(data))
+
+def register(tag):
+    """Return a class decorator registering classes for serialization.
+
+    `tag` is the unique name identifying the class in encoded data.
+    Registered classes have to support the pickle state protocol of
+    lightweight objects.
+
+    """
+    def register_cls(cls):
+        """Register the given class.
+
+        `cls` is the class to register.
+
+        """
+        _classes[tag] = cls
+        _tags[cls] = tag
+        return cls
+
+    return register_cls
+
+def to_json(obj, stream=None):
+    """Return or write the JSON encoding of the given object.
+
+    `obj` is the lightweight object to encode.
+    `stream` is the text stream to write to, None to return a string.
+
+    """
+    version, state = obj.__getstate__()
+    doc = {"format": FORMAT_VERSION, "type": _tags[obj.__class__],
+           "version": version, "state": _json_value(state)}
+
+    if stream is None:
+        return json.dumps(doc, separators=(',', ':'))
+
+    json.dump(doc, stream, separators=(',', ':'))
+
+def _json_dict(obj):
+    """Decode the given JSON object.
+
+    `obj` is the decoded JSON object.
+    Keys decoded as JSON arrays are restored as tuples.
+
+    """
+    return dict((_json_key(key), val) for key, val in obj[_ITEMS_KEY]) if \
+        obj.keys() == [_ITEMS_KEY] else obj
+
+def _json_key(key):
+    """Return the dictionary key decoded from the given JSON value.
+
+    `key` is the decoded JSON value.
+
+    """
+    return tuple(map(_json_key, key)) if isinstance(key, list) else key
+
+def _json_value(value):
+    """Return the JSON-compatible form of the given value.
+
+    `value` is the value to convert.
+    Dictionaries with only string keys are kept as they are, others are
+    converted to lists of key-value pairs. Dictionaries holding the key
+    of converted ones are converted too, so that they aren't mistaken
+    for converted ones when decoded.
+
+    """
+    if isinstance(value, dict):
+
+        if _ITEMS_KEY not in value and all(
+                isinstance(key, basestring) for key in value):
+            return value if all(_json_scalar(val) for val in
+                                value.itervalues()) else dict(
+                (key, _json_value(val)) for key, val in value.iteritems())
+
+        return {_ITEMS_KEY: [[key, _json_value(val)] for key, val in
+                             value.iteritems()]}
+
+    if isinstance(value, (list, tuple)):
+        return map(_json_value, value)
+
+    return value
+
+def _json_scalar(value):
+    """Test if the given value needs no JSON conversion.
+
+    `value` is the value to test.
+
+    """
+    return not isinstance(value, (dict, list, tuple))
+
+def _read_len(stream):
+    """Read a length prefix from the given stream.
+
+    `stream` is the binary stream to read from.
+
+    """
+    return _LEN_FMT.unpack(stream.read(_LEN_FMT.size))[0]
+
+def _read_value(stream, type_code=None):
+    """Read a value from the given stream.
+
+    `stream` is the binary stream to read from.
+    `type_code` is the expected value type code, None to read it from
+                the stream.
+
+    """
+    if type_code is None:
+        type_code = stream.read(1)
+
+    if type_code == _NONE:
+        return None
+
+    if type_code in [_TRUE, _FALSE]:
+        return type_code == _TRUE
+
+    if type_code == _INT:
+        return _INT_FMT.unpack(stream.read(_INT_FMT.size))[0]
+
+    if type_code == _FLOAT:
+        return _FLOAT_FMT.unpack(stream.read(_FLOAT_FMT.size))[0]
+
+    if type_code in [_STR, _UNICODE]:
+
+        data = stream.read(_read_len(stream))
+        return data if type_code == _STR else data.decode("utf-8")
+
+    if type_code == _DICT:
+
+        value = {}
+
+        for _ in xrange(_read_len(stream)):
+
+            key = _read_value(stream)
+            value[key] = _read_value(stream)
+
+        return value
+
+    if type_code in [_LIST, _TUPLE]:
+
+        value = [_read_value(stream) for _ in xrange(_read_len(stream))]
+        return value if type_code == _LIST else tuple(value)
+
+    raise ValueError("unknown value type {!r}".format(type_code))
+
+def _restore(tag, version, state):
+    """Return an object restored from the given state.
+
+    `tag` is the registered class tag.
+    `version` is the state version.
+    `state` is the object state.
+
+    """
+    if tag not in _classes:
+        raise ValueError("unknown object type {!r}".format(tag))
+
+    cls = _classes[tag]
+    # Restoring doesn't call the constructor, which needs COM objects.
+    obj = cls.__new__(cls) if isinstance(cls, type) else \
+        types.InstanceType(cls)
+    obj.__setstate__((version, state))
+    return obj
+
+def _write_str(stream, value):
+    """Write a length-prefixed string to the given stream.
+
+    `stream` is the binary stream to write to.
+    `value` is the byte string to write.
+
+    """
+    stream.write(_LEN_FMT.pack(len(value)))
+    stream.write(value)
+
+def _write_value(stream, value):
+    """Write a value to the given stream.
+
+    `stream` is the binary stream to write to.
+    `value` is the value to write.
+
+    """
+    if value is None:
+        stream.write(_NONE)
+    elif isinstance(value, bool):
+        stream.write(_TRUE if value else _FALSE)
+    elif isinstance(value, (int, long)):
+        stream.write(_INT + _INT_FMT.pack(value))
+    elif isinstance(value, float):
+        stream.write(_FLOAT + _FLOAT_FMT.pack(value))
+    elif isinstance(value, str):
+
+        stream.write(_STR)
+        _write_str(stream, value)
+
+    elif isinstance(value, unicode):
+
+        stream.write(_UNICODE)
+        _write_str(stream, value.encode("utf-8"))
+
+    elif isinstance(value, dict):
+
+        stream.write(_DICT + _LEN_FMT.pack(len(value)))
+
+        for key, val in value.iteritems():
+
+            _write_value(stream, key)
+            _write_value(stream, val)
+
+    elif isinstance(value, (list, tuple)):
+
+        stream.write((_LIST if isinstance(value, list) else _TUPLE) +
+                     _LEN_FMT.pack(len(value)))
+
+        for item in value:
+            _write_value(stream, item)
+
+    else:
+        raise TypeError("can't encode {!r}".format(value))
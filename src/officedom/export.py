@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+
+"""exports document metadata in a columnar layout"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         export.py
+#
+# function:     columnar metadata export
+#
+# description:  collects document snapshots into typed columns with
+#               dictionary-encoded strings and writes them to tables
+#               that can be memory-mapped and filtered column by column
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+from array import array
+import collections
+import json
+import mmap
+import struct
+import sys
+PATH_COL = "path"
+THEME_COL = "active_theme"
+TMPL_COL = "attached_template"
+_STYLE_COL_FMT = "active_writing_style[{}]"
+_MAGIC = "ODCT"
+_VERSION = 1
+# magic, version and JSON header length
+_HEADER_FMT = struct.Struct("<4sBI")
+# column data alignment
+_ALIGNMENT = 8
+# column kinds
+_DICT_KIND = "dict"
+_STR_KIND = "str"
+# unsigned typecodes from the narrowest
+_CODE_TYPES = ["B", "H", "I"]
+_OFFSET_TYPE = "I"
+_BIG_ENDIAN = sys.byteorder == "big"
+
+class Exporter(object):
+
+    """Columnar document metadata exporter
+
+    The exporter collects document snapshots into one typed column per
+    field. Template paths, themes and writing styles are
+    dictionary-encoded; each distinct string is stored once and rows
+    only hold its code. Writing style columns are keyed by language ID.
+
+    """
+
+    def __init__(self):
+        """Create an empty exporter.
+
+        `self` is this exporter.
+
+        """
+        self._paths = []
+        self._cols = collections.OrderedDict(
+            (name, _DictColumn()) for name in [TMPL_COL, THEME_COL])
+
+    def __len__(self):
+        """Return the number of collected rows.
+
+        `self` is this exporter.
+
+        """
+        return len(self._paths)
+
+    def add(self, path, doc_data):
+        """Add a document snapshot.
+
+        `self` is this exporter.
+        `path` is the full path of the document.
+        `doc_data` is the lightweight document to add.
+
+        """
+        row = len(self._paths)
+        self._cols[TMPL_COL].append(doc_data.attached_template)
+        self._cols[THEME_COL].append(doc_data.active_theme)
+        styles = doc_data.active_writing_style
+
+        for lang in styles:
+            # Language names are aliases of language IDs.
+            if isinstance(lang, (int, long)):
+
+                col_name = _STYLE_COL_FMT.format(lang)
+
+                if col_name not in self._cols:
+                    self._cols[col_name] = _DictColumn(row)
+
+                self._cols[col_name].append(styles[lang])
+
+        self._paths.append(unicode(path))
+
+        # Pad writing style columns of languages missing in this row.
+        for col in self._cols.itervalues():
+            if len(col.codes) == row:
+                col.append(None)
+
+    def add_documents(self, docs):
+        """Add the snapshots of the given documents.
+
+        `self` is this exporter.
+        `docs` are the documents to add.
+
+        """
+        for doc in docs:
+            self.add(doc.full_name, doc.data)
+
+    def write(self, file_name):
+        """Write the collected rows to a table file.
+
+        `self` is this exporter.
+        `file_name` is the path of the table file.
+
+        """
+        blobs = []
+        cols = [self._add_path_col(blobs)]
+
+        for name, col in self._cols.iteritems():
+
+            codes = array(_code_type(len(col.values)), col.codes)
+            cols.append({"name": name, "kind": _DICT_KIND,
+                         "typecode": codes.typecode,
+                         "values": col.values})
+            cols[-1].update(_add_blob(blobs, codes))
+
+        header = json.dumps({"rows": len(self._paths), "columns": cols},
+                            separators=(',', ':'))
+        data_start = _align(_HEADER_FMT.size + len(header))
+
+        with open(file_name, "wb") as table_file:
+
+            table_file.write(
+                _HEADER_FMT.pack(_MAGIC, _VERSION, len(header)) + header)
+
+            for blob in blobs:
+
+                table_file.write(
+                    "\0" * (data_start + blob[0] - table_file.tell()))
+                blob[1].tofile(table_file)
+
+    def _add_path_col(self, blobs):
+        """Add the path column data to the given blobs.
+
+        `self` is this exporter.
+        `blobs` are the offsets and arrays of column data.
+        The method returns the path column description.
+
+        """
+        heap = array("c")
+        offsets = array(_OFFSET_TYPE, [0])
+
+        for path in self._paths:
+
+            heap.fromstring(path.encode("utf-8"))
+            offsets.append(len(heap))
+
+        col = {"name": PATH_COL, "kind": _STR_KIND,
+               "typecode": offsets.typecode}
+        col.update(_add_blob(blobs, offsets))
+        heap_info = _add_blob(blobs, heap)
+        col["heap_offset"] = heap_info["offset"]
+        col["heap_size"] = heap_info["size"]
+        return col
+
+
+class Table(object):
+
+    """Memory-mapped columnar table
+
+    Only the parts of the table file needed by each operation are read;
+    filtering by a column reads only that column's codes.
+
+    """
+
+    def __init__(self, file_name):
+        """Open a table file.
+
+        `self` is this table.
+        `file_name` is the path of the table file.
+
+        """
+        self._file = open(file_name, "rb")
+
+        try:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except:
+            self._file.close()
+            raise
+
+        magic, version, header_len = _HEADER_FMT.unpack_from(self._map)
+
+        if magic != _MAGIC or version != _VERSION:
+
+            self.close()
+            raise ValueError("unsupported table format")
+
+        header = json.loads(self._map[
+            _HEADER_FMT.size:_HEADER_FMT.size + header_len])
+        self._data_start = _align(_HEADER_FMT.size + header_len)
+        self._rows = header["rows"]
+        self._cols = collections.OrderedDict(
+            (col["name"], col) for col in header["columns"])
+
+    # context manager support
+    def __enter__(self):
+        """Setup a context for this table.
+
+        `self` is this table.
+
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close this table.
+
+        `self` is this table.
+        `exc_type` is the type of raised exception if one was raised or
+                   None otherwise.
+        `exc_value` is the raised exception if one was raised or None
+                    otherwise.
+        `traceback` is the exception traceback if one was raised or None
+                    otherwise.
+
+        """
+        self.close()
+
+    def __len__(self):
+        """Return the number of rows.
+
+        `self` is this table.
+
+        """
+        return self._rows
+
+    def close(self):
+        """Close this table.
+
+        `self` is this table.
+
+        """
+        self._map.close()
+        self._file.close()
+
+    def column(self, name):
+        """Return the codes of the given column.
+
+        `self` is this table.
+        `name` is the column name.
+        For the path column the method returns the end offsets of paths.
+
+        """
+        col = self._cols[name]
+        return self._read_array(col["typecode"], col["offset"], col["size"])
+
+    def get_path(self, row):
+        """Return the path of the given row.
+
+        `self` is this table.
+        `row` is the row index.
+
+        """
+        col = self._cols[PATH_COL]
+        start, end = struct.unpack_from(
+            "<2" + col["typecode"], self._map, self._data_start +
+            col["offset"] + row * struct.calcsize(col["typecode"]))
+        heap_start = self._data_start + col["heap_offset"]
+        return self._map[heap_start + start:heap_start + end].decode(
+            "utf-8")
+
+    def get_row(self, row):
+        """Return the values of the given row.
+
+        `self` is this table.
+        `row` is the row index.
+
+        """
+        if not 0 <= row < self._rows:
+            raise IndexError(row)
+
+        values = {PATH_COL: self.get_path(row)}
+
+        for name, col in self._cols.iteritems():
+            if col["kind"] == _DICT_KIND:
+                values[name] = col["values"][struct.unpack_from(
+                    "<" + col["typecode"], self._map, self._data_start +
+                    col["offset"] + row * struct.calcsize(col["typecode"]))[
+                    0]]
+
+        return values
+
+    def select(self, name, value):
+        """Return the indices of rows having the given value.
+
+        `self` is this table.
+        `name` is the name of a dictionary-encoded column.
+        `value` is the value to look for, None for missing values.
+
+        """
+        try:
+            code = self._cols[name]["values"].index(value)
+        except ValueError:
+            return []
+
+        return [row for row, cur_code in enumerate(self.column(name)) if
+                cur_code == code]
+
+    def values(self, name):
+        """Return the distinct values of the given column.
+
+        `self` is this table.
+        `name` is the name of a dictionary-encoded column.
+        The value at each index is the one encoded by that code; None
+        stands for missing values.
+
+        """
+        return list(self._cols[name]["values"])
+
+    @property
+    def columns(self):
+        """Column names
+
+        `self` is this table.
+
+        """
+        return self._cols.keys()
+
+    def _read_array(self, typecode, offset, size):
+        """Return an array read from the table data.
+
+        `self` is this table.
+        `typecode` is the array typecode.
+        `offset` is the array offset from the start of table data.
+        `size` is the array size in bytes.
+
+        """
+        start = self._data_start + offset
+        items = array(typecode)
+        items.fromstring(self._map[start:start + size])
+
+        if _BIG_ENDIAN:
+            items.byteswap()
+
+        return items
+
+
+class _DictColumn(object):
+
+    """Dictionary-encoded column being collected"""
+
+    def __init__(self, rows=0):
+        """Create a column.
+
+        `self` is this column.
+        `rows` is the number of preceding rows with missing values.
+
+        """
+        self.codes = array("I", [0]) * rows
+        # None is reserved for missing values.
+        self.values = [None]
+        self._codes = {None: 0}
+
+    def append(self, value):
+        """Append a value to this column.
+
+        `self` is this column.
+        `value` is the value to append, None if missing.
+
+        """
+        if value not in self._codes:
+
+            self._codes[value] = len(self.values)
+            self.values.append(value)
+
+        self.codes.append(self._codes[value])
+
+def _add_blob(blobs, items):
+    """Append an array to the given blobs.
+
+    `blobs` are the offsets and arrays of column data.
+    `items` is the array to append.
+    The function returns the offset and size of the array.
+
+    """
+    offset = _align(blobs[-1][0] + _blob_size(blobs[-1][1])) if blobs else 0
+
+    if _BIG_ENDIAN and items.itemsize > 1:
+
+        items = array(items.typecode, items)
+        items.byteswap()
+
+    blobs.append((offset, items))
+    return {"offset": offset, "size": _blob_size(items)}
+
+def _align(offset):
+    """Return the given offset rounded up to the data alignment.
+
+    `offset` is the offset to align.
+
+    """
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+def _blob_size(items):
+    """Return the size of the given array in bytes.
+
+    `items` is the array to measure.
+
+    """
+    return len(items) * items.itemsize
+
+def _code_type(num_of_values):
+    """Return the narrowest typecode for codes of the given values.
+
+    `num_of_values` is the number of distinct values.
+
+    """
+    return next(typecode for typecode in _CODE_TYPES if
+                num_of_values <= 1 << 8 * array(typecode).itemsize)
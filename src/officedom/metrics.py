@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+"""collects operational metrics"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         metrics.py
+#
+# function:     metrics registry
+#
+# description:  keeps counters, gauges and histograms and renders them
+#               in the prometheus text exposition format
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import bisect
+import contextlib
+import threading
+from timeit import default_timer
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+_INF = float("inf")
+
+class Counter(object):
+
+    """Monotonically increasing metric"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        """Create a counter.
+
+        `self` is this counter.
+        `name` is the metric name.
+        `help_text` is the metric description.
+        `label_names` are the names of the metric labels.
+
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *label_values, **kwargs):
+        """Increase this counter.
+
+        `self` is this counter.
+        Positional arguments are the label values.
+        The optional `amount` keyword argument is the increase, one by
+        default.
+
+        """
+        amount = kwargs.get("amount", 1)
+
+        with self._lock:
+            self._values[label_values] = self._values.get(
+                label_values, 0) + amount
+
+    def remove(self, *label_values):
+        """Remove the series with the given leading label values.
+
+        `self` is this counter.
+        Positional arguments are the values of the leading labels of
+        the series to remove.
+
+        """
+        with self._lock:
+            _remove_series(self._values, label_values)
+
+    def samples(self):
+        """Return the current samples of this counter.
+
+        `self` is this counter.
+        The method returns a list of (name suffix, label values, value)
+        tuples.
+
+        """
+        with self._lock:
+            return [("", labels, value) for labels, value in
+                    sorted(self._values.iteritems())]
+
+
+class Gauge(Counter):
+
+    """Metric that can go up and down
+
+    A gauge either holds values set explicitly or collects them from a
+    function upon rendering.
+
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, label_names=(), collect=None):
+        """Create a gauge.
+
+        `self` is this gauge.
+        `name` is the metric name.
+        `help_text` is the metric description.
+        `label_names` are the names of the metric labels.
+        `collect` is the function returning an iterable of (label values,
+                  value) pairs upon rendering, None to hold values set
+                  explicitly.
+
+        """
+        Counter.__init__(self, name, help_text, label_names)
+        self._collect = collect
+
+    def samples(self):
+        """Return the current samples of this gauge.
+
+        `self` is this gauge.
+        The method returns a list of (name suffix, label values, value)
+        tuples.
+
+        """
+        if self._collect is None:
+            return Counter.samples(self)
+
+        return [("", tuple(labels), value) for labels, value in
+                self._collect()]
+
+    def set(self, value, *label_values):
+        """Set this gauge.
+
+        `self` is this gauge.
+        `value` is the new value.
+        Positional arguments are the label values.
+
+        """
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(object):
+
+    """Metric counting observations in buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, label_names=(),
+                 buckets=DEFAULT_BUCKETS):
+        """Create a histogram.
+
+        `self` is this histogram.
+        `name` is the metric name.
+        `help_text` is the metric description.
+        `label_names` are the names of the metric labels.
+        `buckets` are the ascending upper bounds of the buckets.
+
+        """
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._bounds = list(buckets) + [_INF]
+        self._lock = threading.Lock()
+        # bucket counts and sum by label values
+        self._values = {}
+
+    def observe(self, value, *label_values):
+        """Record an observation.
+
+        `self` is this histogram.
+        `value` is the observed value.
+        Positional arguments are the label values.
+
+        """
+        with self._lock:
+
+            if label_values not in self._values:
+                self._values[label_values] = [[0] * len(self._bounds), 0.0]
+
+            counts = self._values[label_values]
+            counts[0][bisect.bisect_left(self._bounds, value)] += 1
+            counts[1] += value
+
+    def remove(self, *label_values):
+        """Remove the series with the given leading label values.
+
+        `self` is this histogram.
+        Positional arguments are the values of the leading labels of
+        the series to remove.
+
+        """
+        with self._lock:
+            _remove_series(self._values, label_values)
+
+    def samples(self):
+        """Return the current samples of this histogram.
+
+        `self` is this histogram.
+        The method returns a list of (name suffix, label values, value)
+        tuples.
+
+        """
+        samples = []
+
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.iteritems()):
+
+                cum_count = 0
+
+                for bound, count in zip(self._bounds, counts):
+
+                    cum_count += count
+                    samples.append(("_bucket", labels + (
+                        "+Inf" if bound == _INF else repr(bound),),
+                                    cum_count))
+
+                samples.append(("_sum", labels, total))
+                samples.append(("_count", labels, cum_count))
+
+        return samples
+
+    @contextlib.contextmanager
+    def time(self, *label_values):
+        """Record the duration of a context in seconds.
+
+        `self` is this histogram.
+        Positional arguments are the label values.
+
+        """
+        start = default_timer()
+
+        try:
+            yield
+        finally:
+            self.observe(default_timer() - start, *label_values)
+
+
+class Registry(object):
+
+    """Registry of metrics"""
+
+    def __init__(self):
+        """Create an empty registry.
+
+        `self` is this registry.
+
+        """
+        self._metrics = []
+
+    def add(self, metric):
+        """Register the given metric and return it.
+
+        `self` is this registry.
+        `metric` is the metric to register.
+
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return all metrics in the prometheus text exposition format.
+
+        `self` is this registry.
+
+        """
+        lines = []
+
+        for metric in self._metrics:
+
+            lines.append("# HELP {} {}".format(metric.name, metric.help_text))
+            lines.append("# TYPE {} {}".format(metric.name, metric.kind))
+
+            for suffix, labels, value in metric.samples():
+
+                label_names = metric.label_names + (
+                    ("le",) if suffix == "_bucket" else ())
+                lines.append("{}{}{} {}".format(
+                    metric.name, suffix, _format_labels(label_names, labels),
+                    _format_value(value)))
+
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+def render(registry=REGISTRY):
+    """Return the metrics of the given registry in the prometheus text
+    exposition format.
+
+    `registry` is the registry to render.
+
+    """
+    return registry.render()
+
+def _format_labels(names, values):
+    """Return the prometheus representation of the given labels.
+
+    `names` are the label names.
+    `values` are the label values.
+
+    """
+    if not names:
+        return ""
+
+    return "{{{}}}".format(",".join('{}="{}"'.format(name, str(
+        value).replace("\\", r"\\").replace('"', r'\"').replace(
+            "\n", r"\n")) for name, value in zip(names, values)))
+
+def _format_value(value):
+    """Return the prometheus representation of the given value.
+
+    `value` is the sample value.
+
+    """
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _remove_series(values, label_values):
+    """Remove the series with the given leading label values.
+
+    `values` are the series values by label values.
+    `label_values` are the values of the leading labels of the series
+                   to remove.
+
+    """
+    for labels in [labels for labels in values if
+                   labels[:len(label_values)] == label_values]:
+        del values[labels]
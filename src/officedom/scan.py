@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+
+"""scans directory trees for document metadata"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         scan.py
+#
+# function:     document tree scanner
+#
+# description:  walks a directory tree with a pool of word processes
+#               and writes the lightweight metadata of every document
+#               as a JSON line, resuming from a checkpoint file
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import argparse
+import collections
+import json
+import os
+import Queue
+import sys
+import threading
+from timeit import default_timer
+import pythoncom
+import word
+DEFAULT_EXTENSIONS = (".doc", ".docx", ".dot", ".dotx", ".rtf")
+# prefix of the owner files word creates beside open documents
+_OWNER_PREFIX = "~$"
+
+class Scanner(object):
+
+    """Directory tree scanner
+
+    Every worker thread drives its own word process, so documents are
+    scanned concurrently by as many processes as there are workers.
+    Each scanned document is written as a JSON line holding its path
+    and either its loaded snapshot fields or the error scanning it. Paths of
+    scanned documents are appended to the checkpoint file, if any, and
+    skipped when scanning again; failed documents are retried.
+
+    """
+
+    def __init__(self, out_stream, workers=2, checkpoint=None,
+                 fields=None, extensions=DEFAULT_EXTENSIONS, **app_args):
+        """Create a scanner.
+
+        `self` is this scanner.
+        `out_stream` is the text stream to write JSON lines to.
+        `workers` is the number of word processes scanning documents.
+        `checkpoint` is the path of the file listing scanned documents,
+                     None to scan all documents.
+        `fields` names the snapshot fields to load, all fields by
+                 default.
+        `extensions` are the lower case extensions of document files.
+        Keyword arguments are passed to the word application of every
+        worker.
+
+        """
+        self._out_stream = out_stream
+        self._workers = workers
+        self._fields = fields
+        self._extensions = tuple(extensions)
+        self._app_args = app_args
+        self._lock = threading.Lock()
+        self._done = set()
+        self._checkpoint = None
+
+        if checkpoint:
+
+            if os.path.isfile(checkpoint):
+                with open(checkpoint) as in_stream:
+                    self._done.update(
+                        line.rstrip("\n").decode("utf-8") for line in
+                        in_stream)
+
+            self._checkpoint = open(checkpoint, "a")
+
+        self._latencies = []
+        self.failed = 0
+        self.skipped = 0
+        self.elapsed = 0
+
+    def close(self):
+        """Close the checkpoint file.
+
+        `self` is this scanner.
+
+        """
+        if self._checkpoint:
+            self._checkpoint.close()
+
+    def percentile(self, pct):
+        """Return the given percentile of scan latencies in seconds.
+
+        `self` is this scanner.
+        `pct` is the percentile to return.
+        The nearest-rank percentile of successfully scanned documents is
+        returned, zero if none was scanned.
+
+        """
+        latencies = sorted(self._latencies)
+
+        if not latencies:
+            return 0
+
+        rank = -(-len(latencies) * pct // 100)
+        return latencies[max(rank, 1) - 1]
+
+    def scan(self, root):
+        """Scan all documents under the given directory.
+
+        `self` is this scanner.
+        `root` is the directory to scan.
+
+        """
+        start = default_timer()
+        # Bound the paths walked ahead of the workers.
+        paths = Queue.Queue(self._workers * 4)
+        threads = [threading.Thread(
+            target=self._run, args=[paths], name="officedom scanner") for _
+                   in xrange(self._workers)]
+
+        for cur_thread in threads:
+
+            cur_thread.daemon = True
+            cur_thread.start()
+
+        try:
+            for path in self._iter_paths(root):
+                paths.put(path)
+        finally:
+
+            for _ in threads:
+                paths.put(None)
+
+            for cur_thread in threads:
+                cur_thread.join()
+
+            self.elapsed += default_timer() - start
+
+    def summary(self):
+        """Return a summary of the throughput of scans so far.
+
+        `self` is this scanner.
+
+        """
+        num_of_files = len(self._latencies)
+        rate = num_of_files / self.elapsed if self.elapsed else 0
+        return "{} files scanned, {} failed, {} skipped in {:.1f}s " \
+            "({:.1f} files/sec), latency p50 {:.0f} ms, p99 {:.0f} ms".format(
+                num_of_files, self.failed, self.skipped, self.elapsed, rate,
+                self.percentile(50) * 1000, self.percentile(99) * 1000)
+
+    def _iter_paths(self, root):
+        """Generate the paths of documents to scan.
+
+        `self` is this scanner.
+        `root` is the directory to scan.
+
+        """
+        for dir_path, dir_names, file_names in os.walk(unicode(root)):
+
+            dir_names.sort()
+
+            for cur_file in sorted(file_names):
+                if cur_file.lower().endswith(self._extensions) and \
+                        not cur_file.startswith(_OWNER_PREFIX):
+
+                    path = os.path.abspath(os.path.join(dir_path, cur_file))
+
+                    if path in self._done:
+                        self.skipped += 1
+                    else:
+                        yield path
+
+    def _run(self, paths):
+        """Scan queued documents until no more paths are queued.
+
+        `self` is this scanner.
+        `paths` is the queue of document paths.
+
+        """
+        pythoncom.CoInitialize()
+
+        try:
+
+            try:
+                app = word.Application(**self._app_args)
+            # Fail the documents rather than block walking the tree.
+            except Exception as err:
+
+                for path in iter(paths.get, None):
+                    self._write(path, _error_record(path, err))
+
+                return
+
+            with app:
+                for path in iter(paths.get, None):
+                    self._scan_file(app, path)
+
+        finally:
+            pythoncom.CoUninitialize()
+
+    def _scan_file(self, app, path):
+        """Scan the given document and write its record.
+
+        `self` is this scanner.
+        `app` is the word application to open the document in.
+        `path` is the document path.
+
+        """
+        start = default_timer()
+
+        try:
+            with app.documents.open(
+                    path, fields=self._fields, scan=True) as doc:
+                data = _data_fields(doc.data)
+        except Exception as err:
+            self._write(path, _error_record(path, err))
+        else:
+            self._write(path, json.dumps({"path": path, "data": data}),
+                        default_timer() - start)
+
+    def _write(self, path, record, latency=None):
+        """Write the record of the given document.
+
+        `self` is this scanner.
+        `path` is the document path.
+        `record` is the JSON line of the document.
+        `latency` is the time taken to scan the document in seconds,
+                  None if scanning it failed.
+        Only scanned documents are checkpointed and timed.
+
+        """
+        with self._lock:
+
+            self._out_stream.write(record + "\n")
+            self._out_stream.flush()
+
+            if latency is None:
+                self.failed += 1
+            else:
+
+                self._latencies.append(latency)
+
+                if self._checkpoint:
+
+                    self._checkpoint.write(path.encode("utf-8") + "\n")
+                    self._checkpoint.flush()
+
+def main(args=None):
+    """entry point for scanning a directory tree
+
+    `args` are the command line arguments, None for those of this
+    process.
+    The throughput summary is written to the standard error.
+
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m officedom.scan",
+        description="Write the metadata of documents under a directory "
+        "as JSON lines.")
+    parser.add_argument("root", help="directory to scan")
+    parser.add_argument("-o", "--output",
+                        help="file to append JSON lines to, the standard "
+                        "output by default")
+    parser.add_argument("-w", "--workers", type=int, default=2,
+                        help="number of word processes (default: 2)")
+    parser.add_argument("-c", "--checkpoint",
+                        help="file of scanned documents to resume from")
+    parser.add_argument("-f", "--fields",
+                        help="comma-separated snapshot fields to load, all "
+                        "by default")
+    parser.add_argument("-e", "--extensions",
+                        default=",".join(DEFAULT_EXTENSIONS),
+                        help="comma-separated document file extensions")
+    parser.add_argument("-t", "--call-timeout", type=float,
+                        help="seconds to wait for every word call")
+    options = parser.parse_args(args)
+    out_stream = open(options.output, "a") if options.output else \
+        sys.stdout
+    scanner = Scanner(
+        out_stream, options.workers, options.checkpoint,
+        options.fields.split(",") if options.fields else None,
+        options.extensions.lower().split(","),
+        call_timeout=options.call_timeout, watchdog=word.WatchdogPolicy())
+
+    try:
+        scanner.scan(options.root)
+    finally:
+
+        scanner.close()
+
+        if options.output:
+            out_stream.close()
+
+    print >> sys.stderr, scanner.summary()
+
+def _data_fields(doc_data):
+    """Return the loaded public fields of the given snapshot.
+
+    `doc_data` is the lightweight document to return whose fields.
+    Mappings, like writing styles, are returned as plain dictionaries.
+
+    """
+    fields = {}
+
+    for field in dir(doc_data):
+        if not field.startswith("_") and hasattr(doc_data, field):
+
+            value = getattr(doc_data, field)
+
+            if isinstance(value, collections.Mapping):
+                fields[field] = dict(value)
+            elif not callable(value):
+                fields[field] = value
+
+    return fields
+
+def _error_record(path, err):
+    """Return the JSON line of a document that couldn't be scanned.
+
+    `path` is the document path.
+    `err` is the error scanning the document.
+
+    """
+    return json.dumps({"path": path, "error": repr(err)})
+
+if __name__ == '__main__':
+    main()
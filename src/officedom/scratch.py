@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""manages scratch files for in-memory document transfer"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         scratch.py
+#
+# function:     scratch file area
+#
+# description:  stages documents passed to and from word as bytes
+#               through files in a memory-backed scratch directory
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import atexit
+import itertools
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+# memory-backed directory preferred for scratch files
+_SHM_DIR = "/dev/shm"
+_area = None
+_area_lock = threading.Lock()
+
+class ScratchArea(object):
+
+    """Directory of scratch files
+
+    The directory is created once and reused by all scratch files, and
+    removed with whatever files are left in it upon closing the area.
+
+    """
+
+    def __init__(self, root=None):
+        """Create a scratch area.
+
+        `self` is this scratch area.
+        `root` is the directory to create the scratch area in, None to
+               prefer a memory-backed file system if available and the
+               temporary directory otherwise.
+
+        """
+        if root is None:
+            root = _SHM_DIR if os.path.isdir(_SHM_DIR) else None
+
+        self.path = tempfile.mkdtemp(prefix="officedom-", dir=root)
+        self._counter = itertools.count()
+
+    def close(self):
+        """Remove this scratch area and all its files.
+
+        `self` is this scratch area.
+
+        """
+        shutil.rmtree(self.path, True)
+
+    def discard(self, file_name):
+        """Remove the given scratch file.
+
+        `self` is this scratch area.
+        `file_name` is the scratch file to remove.
+        Files still in use are left for closing the area to remove.
+
+        """
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+
+    def new_file(self, suffix=""):
+        """Return the path of a new scratch file.
+
+        `self` is this scratch area.
+        `suffix` is the file name suffix.
+
+        """
+        return os.path.join(self.path, "{}{}".format(
+            next(self._counter), suffix))
+
+def get_area():
+    """Return the scratch area shared by this process.
+
+    The area is created upon first use and removed upon exit.
+
+    """
+    global _area
+
+    with _area_lock:
+        if _area is None:
+
+            _area = ScratchArea()
+            atexit.register(_area.close)
+
+    return _area
+
+def map_file(file_name):
+    """Return a read-only buffer over the content of the given file.
+
+    `file_name` is the file to map.
+    The buffer is backed by a memory map of the file, so the content
+    isn't copied into memory.
+
+    """
+    with open(file_name, "rb") as in_stream:
+        return buffer(mmap.mmap(
+            in_stream.fileno(), 0, access=mmap.ACCESS_READ))
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+"""indexes document text for full-text search"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         search.py
+#
+# function:     in-memory full-text index
+#
+# description:  keeps an inverted index of document text answering term
+#               and phrase queries without accessing word
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+from array import array
+import re
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+class TextIndex(object):
+
+    """Inverted index of document text
+
+    Each term maps to a compact array of postings, every posting being
+    the number of an indexed document followed by the term position in
+    that document. Removed documents leave stale postings behind, which
+    are purged once they outnumber live ones.
+
+    """
+
+    def __init__(self):
+        """Create an empty index.
+
+        `self` is this index.
+
+        """
+        self.clear()
+
+    def __contains__(self, doc):
+        """Test if the given document is indexed.
+
+        `self` is this index.
+        `doc` is the document to test.
+
+        """
+        return doc in self._doc_nums
+
+    def __len__(self):
+        """Return the number of indexed documents.
+
+        `self` is this index.
+
+        """
+        return len(self._doc_nums)
+
+    def add(self, doc, paragraphs):
+        """Index the given document, replacing any previous entry.
+
+        `self` is this index.
+        `doc` is the document to index.
+        `paragraphs` are the paragraphs of the document text.
+
+        """
+        self.remove(doc)
+        doc_num = self._next_num
+        self._next_num += 1
+        pos = 0
+
+        for cur_para in paragraphs:
+            for pos, term in enumerate(_terms(cur_para), pos):
+                self._postings.setdefault(
+                    term, array("I")).extend([doc_num, pos])
+
+            # Phrases don't span paragraphs.
+            pos += 2
+
+        self._doc_nums[doc] = doc_num
+        self._docs[doc_num] = doc
+        self._sizes[doc_num] = pos
+
+    def clear(self):
+        """Remove all documents.
+
+        `self` is this index.
+
+        """
+        self._postings = {}
+        # document numbers by document
+        self._doc_nums = {}
+        # documents by number
+        self._docs = {}
+        # approximate number of postings by document number
+        self._sizes = {}
+        self._stale = 0
+        self._next_num = 0
+
+    def remove(self, doc):
+        """Remove the given document if indexed.
+
+        `self` is this index.
+        `doc` is the document to remove.
+
+        """
+        if doc not in self._doc_nums:
+            return
+
+        doc_num = self._doc_nums.pop(doc)
+        del self._docs[doc_num]
+        self._stale += self._sizes.pop(doc_num)
+
+        if self._stale > sum(self._sizes.itervalues()):
+            self._purge()
+
+    def search(self, query, phrase=True):
+        """Return the documents matching the given query.
+
+        `self` is this index.
+        `query` is the text to look for.
+        `phrase` is whether the query terms have to appear consecutively
+                 or just anywhere in a document.
+        Terms are matched case-insensitively. Documents are returned in
+        the order they were indexed.
+
+        """
+        terms = list(_terms(query))
+
+        if not terms:
+            return []
+
+        matches = None
+
+        for offset, term in enumerate(terms):
+
+            postings = self._postings.get(term, ())
+            hits = set(zip(postings[::2], [
+                pos - offset for pos in postings[1::2]])) if phrase else \
+                set(postings[::2])
+            matches = hits if matches is None else matches & hits
+
+            if not matches:
+                return []
+
+        if phrase:
+            matches = set(doc_num for doc_num, _ in matches)
+
+        return [self._docs[doc_num] for doc_num in sorted(matches) if
+                doc_num in self._docs]
+
+    def _purge(self):
+        """Drop the postings of removed documents.
+
+        `self` is this index.
+
+        """
+        for term, postings in self._postings.items():
+
+            live = array("I")
+
+            for idx in xrange(0, len(postings), 2):
+                if postings[idx] in self._docs:
+                    live.extend(postings[idx:idx + 2])
+
+            if live:
+                self._postings[term] = live
+            else:
+                del self._postings[term]
+
+        self._stale = 0
+
+def _terms(text):
+    """Generate the lower case terms of the given text.
+
+    `text` is the text to split into terms.
+
+    """
+    return (match.group().lower() for match in
+            _WORD_PATTERN.finditer(text))
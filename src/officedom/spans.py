@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+
+"""records timed spans of wrapper operations"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         spans.py
+#
+# function:     operation spans
+#
+# description:  times nested wrapper operations and emits them to
+#               pluggable sinks, including a chrome trace event writer
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import collections
+import contextlib
+import json
+import os
+import thread
+import threading
+from timeit import default_timer
+# finished span
+Span = collections.namedtuple(
+    "Span", ["name", "start", "duration", "attrs", "thread_id", "depth"])
+# tracers of the spans currently open on each thread
+_local = threading.local()
+
+class ChromeTraceSink(object):
+
+    """Sink writing spans as chrome trace events
+
+    The output is a JSON array of complete events that can be loaded in
+    chrome://tracing or other flame graph viewers.
+
+    """
+
+    def __init__(self, stream):
+        """Create a chrome trace sink.
+
+        `self` is this sink.
+        `stream` is the text stream or file path to write events to.
+
+        """
+        self._own_stream = isinstance(stream, basestring)
+        self._stream = open(stream, "w") if self._own_stream else stream
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._stream.write("[")
+        self._first = True
+
+    # context manager support
+    def __enter__(self):
+        """Setup a context for this sink.
+
+        `self` is this sink.
+
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close this sink.
+
+        `self` is this sink.
+        `exc_type` is the type of raised exception if one was raised or
+                   None otherwise.
+        `exc_value` is the raised exception if one was raised or None
+                    otherwise.
+        `traceback` is the traceback when the exception occurred, if
+                    any, or None otherwise.
+
+        """
+        self.close()
+
+    def close(self):
+        """Terminate the event array and close the stream if owned.
+
+        `self` is this sink.
+
+        """
+        with self._lock:
+
+            self._stream.write("]\n")
+
+            if self._own_stream:
+                self._stream.close()
+            else:
+                self._stream.flush()
+
+    def emit(self, span):
+        """Write the given span.
+
+        `self` is this sink.
+        `span` is the finished span.
+
+        """
+        event = json.dumps(
+            {"name": span.name, "ph": "X", "ts": int(span.start * 1e6),
+             "dur": int(span.duration * 1e6), "pid": self._pid,
+             "tid": span.thread_id,
+             "args": dict((key, _format_attr(val)) for key, val in
+                          span.attrs.iteritems())}, separators=(",", ":"))
+
+        with self._lock:
+
+            self._stream.write(event if self._first else ",\n" + event)
+            self._first = False
+
+
+class Tracer(object):
+
+    """Span tracer
+
+    The tracer times operations as spans, nested by the order they're
+    entered on each thread, and emits every finished span to its sink.
+    A sink is any object having an emit method accepting a Span. Spans
+    the sink fails to emit are dropped and counted, so tracing never
+    fails the traced operations.
+
+    """
+
+    def __init__(self, sink):
+        """Create a tracer.
+
+        `self` is this tracer.
+        `sink` is the sink to emit finished spans to.
+
+        """
+        self._sink = sink
+        self.dropped = 0
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        """Time the context as a span.
+
+        `self` is this tracer.
+        `name` is the span name.
+        Keyword arguments are the span attributes.
+        The context yields the span attributes, which may be extended
+        until the span finishes.
+
+        """
+        stack = _get_stack()
+        stack.append(self)
+        start = default_timer()
+
+        try:
+            yield attrs
+        finally:
+
+            duration = default_timer() - start
+            stack.pop()
+
+            try:
+                self._sink.emit(Span(name, start, duration, attrs,
+                                     thread.get_ident(), len(stack)))
+            except Exception:
+                self.dropped += 1
+
+
+class _NullSpan(object):
+
+    """Context doing nothing, used when tracing is disabled"""
+
+    def __enter__(self):
+        """Enter the context.
+
+        `self` is this null span.
+        The method returns None in place of span attributes.
+
+        """
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the context.
+
+        `self` is this null span.
+        `exc_type` is the type of raised exception if one was raised or
+                   None otherwise.
+        `exc_value` is the raised exception if one was raised or None
+                    otherwise.
+        `traceback` is the traceback when the exception occurred, if
+                    any, or None otherwise.
+
+        """
+
+NULL_SPAN = _NullSpan()
+
+def span(name, **attrs):
+    """Return a span nested in the innermost open span of this thread.
+
+    `name` is the span name.
+    Keyword arguments are the span attributes.
+    The function returns a context doing nothing and yielding None if
+    no span is open on this thread, so code without access to a tracer
+    can still report finer spans.
+
+    """
+    stack = _get_stack()
+    return stack[-1].span(name, **attrs) if stack else NULL_SPAN
+
+def _format_attr(value):
+    """Return the text form of the given span attribute.
+
+    `value` is the attribute value.
+    Byte strings are decoded as UTF-8, replacing invalid bytes, and
+    values without a text form are represented by repr.
+
+    """
+    if isinstance(value, str):
+        return value.decode("utf-8", "replace")
+
+    try:
+        return unicode(value)
+    except UnicodeError:
+        return repr(value)
+
+def _get_stack():
+    """Return the stack of tracers with open spans on this thread."""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+
+    return _local.stack
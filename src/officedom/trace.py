@@ -0,0 +1,687 @@
+# -*- coding: utf-8 -*-
+
+"""records and replays COM call traces"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         trace.py
+#
+# function:     COM call tracing
+#
+# description:  records COM calls made through office DOM wrappers to
+#               compact binary trace files and replays them against a
+#               simulated object model
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import collections
+from functools import partial
+import operator
+import struct
+import threading
+import time
+from timeit import default_timer
+import types
+import zlib
+# operations
+GET = 0
+SET = 1
+CALL = 2
+ITER = 3
+LEN = 4
+CONTAINS = 5
+GET_ITEM = 6
+# result shapes
+NONE = 0
+BOOL = 1
+INT = 2
+FLOAT = 3
+STR = 4
+OBJECT = 5
+SEQUENCE = 6
+OTHER = 7
+ERROR = 8
+_MAGIC = "ODTR"
+_VERSION = 1
+# record kinds
+_NAME_REC = 0
+_CALL_REC = 1
+# name record: member ID, name length
+_NAME_FMT = struct.Struct("<HH")
+# call record: object ID, member ID, operation, arguments digest, result
+# shape, result value(object ID or item count), duration in microseconds
+_CALL_FMT = struct.Struct("<IHBIBII")
+_KIND_FMT = struct.Struct("<B")
+_HEADER_FMT = struct.Struct("<4sB")
+# call record as read from a trace file
+CallRecord = collections.namedtuple(
+    "CallRecord", ["obj_id", "member", "op", "args_digest", "shape",
+                   "result", "duration"])
+MemberStats = collections.namedtuple(
+    "MemberStats", ["calls", "recorded_time", "replay_time"])
+
+class Recorder(object):
+
+    """COM call recorder
+
+    The recorder wraps raw COM objects so that every call made through
+    them is logged to a binary trace file. Only the shape of arguments
+    and results is logged, never their content.
+
+    """
+
+    def __init__(self, stream):
+        """Create a recorder.
+
+        `self` is this recorder.
+        `stream` is the binary stream or file path to write the trace
+                 to.
+
+        """
+        self._own_stream = isinstance(stream, basestring)
+        self._stream = open(stream, "wb") if self._own_stream else stream
+        self._stream.write(_HEADER_FMT.pack(_MAGIC, _VERSION))
+        self._lock = threading.Lock()
+        self._members = {}
+        # ID of the last traced object
+        self._last_id = 0
+
+    # context manager support
+    def __enter__(self):
+        """Setup a context for this recorder.
+
+        `self` is this recorder.
+
+        """
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close this recorder.
+
+        `self` is this recorder.
+        `exc_type` is the type of raised exception if one was raised or
+                   None otherwise.
+        `exc_value` is the raised exception if one was raised or None
+                    otherwise.
+        `traceback` is the traceback when the exception occurred, if
+                    any, or None otherwise.
+
+        """
+        self.close()
+
+    def close(self):
+        """Flush the trace and close it if opened by this recorder.
+
+        `self` is this recorder.
+
+        """
+        self._stream.flush()
+
+        if self._own_stream:
+            self._stream.close()
+
+    def invoke(self, obj, member, op, func, *args, **kwargs):
+        """Run and record the given call on a traced object.
+
+        `self` is this recorder.
+        `obj` is the traced object.
+        `member` is the name of the accessed member.
+        `op` is the operation performed on the member.
+        `func` is the call to run.
+        Positional and keyword arguments are passed to the call after
+        unwrapping traced objects.
+        The method returns the call result with COM objects traced. It
+        isn't intended for direct use by clients.
+
+        """
+        raw_args = map(_unwrap, args)
+        raw_kwargs = dict(
+            (key, _unwrap(val)) for key, val in kwargs.iteritems())
+        start = default_timer()
+
+        try:
+
+            result = func(*raw_args, **raw_kwargs)
+
+            if op == ITER:
+                result = list(result)
+
+        except Exception:
+
+            with self._lock:
+                self._write_call(obj.obj_id, member, op, _digest(
+                    args, kwargs), ERROR, 0, default_timer() - start)
+
+            raise
+
+        return self.record(obj, member, op, args, kwargs, result,
+                           default_timer() - start)
+
+    def record(self, obj, member, op, args, kwargs, result, duration):
+        """Record the given call on a traced object.
+
+        `self` is this recorder.
+        `obj` is the traced object.
+        `member` is the name of the accessed member.
+        `op` is the operation performed on the member.
+        `args` are the positional arguments of the call.
+        `kwargs` are the keyword arguments of the call.
+        `result` is the raw call result.
+        `duration` is the call duration in seconds.
+        The method returns the call result with COM objects traced. It
+        isn't intended for direct use by clients.
+
+        """
+        with self._lock:
+
+            shape, value, result = self._trace_result(result)
+            self._write_call(obj.obj_id, member, op, _digest(args, kwargs),
+                             shape, value, duration)
+
+        return result
+
+    def wrap(self, raw_obj):
+        """Return a traced object for the given raw one.
+
+        `self` is this recorder.
+        `raw_obj` is the raw COM object to trace.
+
+        """
+        with self._lock:
+            return self._new_obj(raw_obj)
+
+    def _member_id(self, name):
+        """Return the ID of the given member name, defining it if new.
+
+        `self` is this recorder.
+        `name` is the member name.
+
+        """
+        if name not in self._members:
+
+            self._members[name] = len(self._members)
+            encoded_name = name.encode("utf-8")
+            self._stream.write(_KIND_FMT.pack(_NAME_REC) + _NAME_FMT.pack(
+                self._members[name], len(encoded_name)) + encoded_name)
+
+        return self._members[name]
+
+    def _new_obj(self, raw_obj):
+        """Return a new traced object for the given raw one.
+
+        `self` is this recorder.
+        `raw_obj` is the raw COM object to trace.
+
+        """
+        self._last_id += 1
+        return _TracedObject(self, raw_obj, self._last_id)
+
+    def _trace_item(self, item):
+        """Return the traced form of the given sequence item.
+
+        `self` is this recorder.
+        `item` is the raw sequence item.
+
+        """
+        if _shape(item) == OBJECT:
+            return self._new_obj(item)
+
+        # Every item takes an ID so that replayers can infer the IDs of
+        # sequence items from their count.
+        self._last_id += 1
+        return item
+
+    def _trace_result(self, result):
+        """Return the shape, value, and traced form of the given result.
+
+        `self` is this recorder.
+        `result` is the raw call result.
+
+        """
+        if isinstance(result, list):
+            return SEQUENCE, len(result), map(self._trace_item, result)
+
+        shape = _shape(result)
+
+        if shape == OBJECT:
+
+            result = self._new_obj(result)
+            return shape, result.obj_id, result
+
+        return shape, 0, result
+
+    def _write_call(self, obj_id, member, op, args_digest, shape, value,
+                    duration):
+        """Write a call record.
+
+        `self` is this recorder.
+        `obj_id` is the ID of the called object.
+        `member` is the member name.
+        `op` is the operation performed on the member.
+        `args_digest` is the digest of the call arguments.
+        `shape` is the shape of the call result.
+        `value` is the object ID or item count of the call result.
+        `duration` is the call duration in seconds.
+
+        """
+        member_id = self._member_id(member)
+        self._stream.write(_KIND_FMT.pack(_CALL_REC) + _CALL_FMT.pack(
+            obj_id, member_id, op, args_digest, shape, value,
+            min(int(duration * 1e6), 0xFFFFFFFF)))
+
+
+class Replayer(object):
+
+    """COM trace replayer
+
+    The replayer drives a recorded trace against a simulated object
+    model which reproduces the recorded objects, result shapes, and
+    (scaled) call durations, so access patterns recorded in production
+    can be profiled and benchmarked without word.
+
+    """
+
+    def __init__(self, speed=0):
+        """Create a replayer.
+
+        `self` is this replayer.
+        `speed` is the factor to scale recorded call durations by when
+                simulating them, 0 to replay calls without delays.
+
+        """
+        self._speed = speed
+        self.objects = {}
+        self.stats = {}
+        self._last_id = 0
+
+    def replay(self, stream):
+        """Replay the given trace.
+
+        `self` is this replayer.
+        `stream` is the binary stream or file path to read the trace
+                 from.
+        The method returns the per-member statistics collected so far,
+        keyed by member name.
+
+        """
+        for record in read(stream):
+
+            start = default_timer()
+            target = self.objects.setdefault(
+                record.obj_id, SimObject(record.obj_id))
+            target.invoke(record, self._speed)
+            self._store_result(record)
+            self._add_stats(record, default_timer() - start)
+
+        return self.stats
+
+    def _add_stats(self, record, replay_time):
+        """Account for the given replayed call.
+
+        `self` is this replayer.
+        `record` is the replayed call.
+        `replay_time` is the time taken to replay the call.
+
+        """
+        stats = self.stats.get(record.member, MemberStats(0, 0, 0))
+        self.stats[record.member] = MemberStats(
+            stats.calls + 1, stats.recorded_time + record.duration,
+            stats.replay_time + replay_time)
+
+    def _store_result(self, record):
+        """Create the simulated objects resulting from the given call.
+
+        `self` is this replayer.
+        `record` is the replayed call.
+
+        """
+        if record.shape == OBJECT:
+            self._last_id = record.result
+            self.objects[record.result] = SimObject(record.result)
+        elif record.shape == SEQUENCE:
+            # Items of a sequence are traced in order, so their IDs are
+            # implied.
+            for _ in xrange(record.result):
+
+                self._last_id += 1
+                self.objects[self._last_id] = SimObject(self._last_id)
+
+
+class SimObject(object):
+
+    """Simulated COM object"""
+
+    def __init__(self, obj_id):
+        """Create a simulated object.
+
+        `self` is this simulated object.
+        `obj_id` is the recorded object ID.
+
+        """
+        self.obj_id = obj_id
+        self.calls = collections.Counter()
+
+    def invoke(self, record, speed):
+        """Simulate the given call on this object.
+
+        `self` is this simulated object.
+        `record` is the call to simulate.
+        `speed` is the factor to scale the recorded duration by.
+
+        """
+        self.calls[record.member, record.op] += 1
+
+        if speed:
+            time.sleep(record.duration * speed)
+
+
+class _TracedObject(object):
+
+    """Traced COM object
+
+    The object forwards all operations to the raw COM object, recording
+    them on the way.
+
+    """
+
+    def __init__(self, recorder, raw_obj, obj_id):
+        """Create a traced object.
+
+        `self` is this traced object.
+        `recorder` is the recorder logging operations.
+        `raw_obj` is the raw COM object.
+        `obj_id` is the ID of this object in the trace.
+
+        """
+        object.__setattr__(self, "_recorder", recorder)
+        object.__setattr__(self, "raw_obj", raw_obj)
+        object.__setattr__(self, "obj_id", obj_id)
+
+    def __call__(self, *args, **kwargs):
+        """Call the raw object.
+
+        `self` is this traced object.
+        Positional and keyword arguments are passed to the raw object.
+
+        """
+        return self._recorder.invoke(
+            self, "__call__", CALL, self.raw_obj, *args, **kwargs)
+
+    def __contains__(self, item):
+        """Test if the raw object contains the given item.
+
+        `self` is this traced object.
+        `item` is the item to look up.
+
+        """
+        return self._recorder.invoke(
+            self, "__contains__", CONTAINS,
+            partial(operator.contains, self.raw_obj), item)
+
+    def __eq__(self, other):
+        """Test if the two objects wrap the same raw object.
+
+        `self` is this traced object.
+        `other` is the other object.
+
+        """
+        return self.raw_obj == _unwrap(other)
+
+    def __getattr__(self, name):
+        """Get the given attribute of the raw object.
+
+        `self` is this traced object.
+        `name` is the attribute.
+        Methods are returned as traced callables recording their calls.
+
+        """
+        start = default_timer()
+        attr_val = getattr(self.raw_obj, name)
+
+        # Methods and private attributes aren't traced as properties.
+        if name.startswith('_'):
+            return attr_val
+
+        if isinstance(attr_val, types.MethodType):
+            return _TracedMethod(self, name, attr_val)
+
+        return self._recorder.record(
+            self, name, GET, (), {}, attr_val, default_timer() - start)
+
+    def __getitem__(self, key):
+        """Get the given item of the raw object.
+
+        `self` is this traced object.
+        `key` is the item index/key.
+
+        """
+        return self._recorder.invoke(
+            self, "__getitem__", GET_ITEM,
+            partial(operator.getitem, self.raw_obj), key)
+
+    def __hash__(self):
+        """Return the hash of the raw object.
+
+        `self` is this traced object.
+
+        """
+        return hash(self.raw_obj)
+
+    def __iter__(self):
+        """Iterate over the items of the raw object.
+
+        `self` is this traced object.
+
+        """
+        return iter(self._recorder.invoke(
+            self, "__iter__", ITER, partial(iter, self.raw_obj)))
+
+    def __len__(self):
+        """Return the number of items of the raw object.
+
+        `self` is this traced object.
+
+        """
+        return self._recorder.invoke(
+            self, "__len__", LEN, partial(len, self.raw_obj))
+
+    def __ne__(self, other):
+        """Test if the two objects wrap different raw objects.
+
+        `self` is this traced object.
+        `other` is the other object.
+
+        """
+        return not self == other
+
+    def __nonzero__(self):
+        """Return the truth value of the raw object.
+
+        `self` is this traced object.
+
+        """
+        return bool(self.raw_obj)
+
+    def __setattr__(self, name, value):
+        """Set the given attribute of the raw object.
+
+        `self` is this traced object.
+        `name` is the attribute.
+        `value` is the desired attribute value.
+
+        """
+        self._recorder.invoke(
+            self, name, SET, partial(setattr, self.raw_obj, name), value)
+
+
+class _TracedMethod(object):
+
+    """Traced COM method"""
+
+    def __init__(self, obj, name, method):
+        """Create a traced method.
+
+        `self` is this traced method.
+        `obj` is the traced object owning the method.
+        `name` is the method name.
+        `method` is the raw bound method.
+
+        """
+        self._obj = obj
+        self._name = name
+        self._method = method
+        # Expose the name like raw methods do.
+        self.__name__ = name
+
+    def __call__(self, *args, **kwargs):
+        """Call the raw method.
+
+        `self` is this traced method.
+        Positional and keyword arguments are passed to the raw method.
+
+        """
+        return self._obj._recorder.invoke(
+            self._obj, self._name, CALL, self._method, *args, **kwargs)
+
+def read(stream):
+    """Generate the call records of the given trace.
+
+    `stream` is the binary stream or file path to read the trace from.
+
+    """
+    own_stream = isinstance(stream, basestring)
+
+    if own_stream:
+        stream = open(stream, "rb")
+
+    try:
+
+        magic, version = _HEADER_FMT.unpack(
+            stream.read(_HEADER_FMT.size))
+
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("unsupported trace format")
+
+        members = {}
+        kind = stream.read(_KIND_FMT.size)
+
+        while kind:
+
+            if _KIND_FMT.unpack(kind)[0] == _NAME_REC:
+
+                member_id, name_len = _NAME_FMT.unpack(
+                    stream.read(_NAME_FMT.size))
+                members[member_id] = stream.read(name_len).decode("utf-8")
+
+            else:
+
+                record = _CALL_FMT.unpack(stream.read(_CALL_FMT.size))
+                yield CallRecord(record[0], members[record[1]], record[2],
+                                 record[3], record[4], record[5],
+                                 record[6] / 1e6)
+
+            kind = stream.read(_KIND_FMT.size)
+
+    finally:
+        if own_stream:
+            stream.close()
+
+def summarize(stream):
+    """Return the per-member statistics of the given trace.
+
+    `stream` is the binary stream or file path to read the trace from.
+    The function returns a dictionary mapping member names to their
+    statistics, with no replay time accounted.
+
+    """
+    stats = {}
+
+    for record in read(stream):
+
+        member_stats = stats.get(record.member, MemberStats(0, 0, 0))
+        stats[record.member] = MemberStats(
+            member_stats.calls + 1,
+            member_stats.recorded_time + record.duration, 0)
+
+    return stats
+
+def _digest(args, kwargs):
+    """Return a digest of the given call arguments.
+
+    `args` are the positional arguments.
+    `kwargs` are the keyword arguments.
+
+    """
+    return zlib.crc32(repr((map(_digest_value, args), sorted(
+        (key, _digest_value(val)) for key, val in kwargs.iteritems())))) & \
+        0xFFFFFFFF
+
+def _digest_value(value):
+    """Return a stable representative of the given argument.
+
+    `value` is the argument.
+    Objects are represented by their trace IDs, since their raw
+    representations vary between runs.
+
+    """
+    if isinstance(value, _TracedObject):
+        return OBJECT, value.obj_id
+
+    return (OBJECT, 0) if _shape(value) in [OBJECT, OTHER] else value
+
+def _shape(value):
+    """Return the shape of the given call result.
+
+    `value` is the call result.
+
+    """
+    if value is None:
+        return NONE
+
+    if isinstance(value, bool):
+        return BOOL
+
+    if isinstance(value, (int, long)):
+        return INT
+
+    if isinstance(value, float):
+        return FLOAT
+
+    if isinstance(value, basestring):
+        return STR
+
+    return OBJECT if hasattr(value, "_oleobj_") else OTHER
+
+def _unwrap(value):
+    """Return the raw form of the given value.
+
+    `value` is the value to unwrap.
+
+    """
+    return value.raw_obj if isinstance(value, _TracedObject) else value
@@ -4,7 +4,7 @@
 
 ############################################################
 #
-# Copyright 2012, 2014, 2017 Mohammed El-Afifi
+# Copyright 2012, 2014, 2017, 2026 Mohammed El-Afifi
 # This file is part of pyofficedom.
 #
 # pyofficedom is free software: you can redistribute it and/or modify
@@ -38,6 +38,86 @@
 #
 ############################################################
 
+import collections
+import pythoncom
+# changes to a dictionary attribute: changed items and removed keys
+MapDelta = collections.namedtuple("MapDelta", ["changed", "removed"])
+
+class BusyMessageFilter:
+
+    """COM message filter retrying calls rejected by busy servers
+
+    Calls rejected by a busy server are retried after a delay which
+    doubles with every retry up to a maximum delay. The filter gives up
+    once the total waiting time exceeds a limit, in which case the call
+    fails with the original rejection error.
+
+    """
+
+    _com_interfaces_ = [pythoncom.IID_IMessageFilter]
+
+    _public_methods_ = [
+        "HandleInComingCall", "MessagePending", "RetryRejectedCall"]
+
+    def __init__(self, max_wait=30, first_delay=0.1, max_delay=5):
+        """Create a message filter.
+
+        `self` is this message filter.
+        `max_wait` is the maximum total time in seconds to keep retrying
+                   a rejected call.
+        `first_delay` is the delay in seconds before the first retry.
+        `max_delay` is the maximum delay in seconds between retries.
+
+        """
+        self._max_wait = int(max_wait * 1000)
+        self._first_delay = int(first_delay * 1000)
+        self._max_delay = int(max_delay * 1000)
+
+    def HandleInComingCall(
+        self, call_type, caller_task, tick_count, interface_info):
+        """Accept the incoming call.
+
+        `self` is this message filter.
+        `call_type` is the type of the incoming call.
+        `caller_task` is the task handle of the caller.
+        `tick_count` is the elapsed time since the call was made.
+        `interface_info` describes the called interface and method.
+
+        """
+        return 0  # SERVERCALL_ISHANDLED
+
+    def MessagePending(self, callee_task, tick_count, pending_type):
+        """Process messages arriving during an outgoing call.
+
+        `self` is this message filter.
+        `callee_task` is the task handle of the callee.
+        `tick_count` is the elapsed time since the call was made.
+        `pending_type` is the type of the pending call.
+
+        """
+        return 2  # PENDINGMSG_WAITDEFPROCESS
+
+    def RetryRejectedCall(self, callee_task, tick_count, reject_type):
+        """Return the delay before retrying the rejected call.
+
+        `self` is this message filter.
+        `callee_task` is the task handle of the callee.
+        `tick_count` is the elapsed time in milliseconds since the call
+                     was made.
+        `reject_type` is the server rejection type.
+        The method returns the retry delay in milliseconds, or -1 to
+        cancel the call.
+
+        """
+        if tick_count >= self._max_wait:
+            return -1
+
+        # Waiting as long as the time elapsed so far doubles the total
+        # waiting time with every retry.
+        return min(max(self._first_delay, tick_count), self._max_delay,
+                   self._max_wait - tick_count)
+
+
 class LightObject:
 
     """In-memory object
@@ -46,25 +126,28 @@ class LightObject:
     properties stored in memory but no indirect resources.
     """
 
+    # version of the state layout, increased upon incompatible changes
+    _STATE_VERSION = 1
+
     def __eq__(self, other):
         """Test if the two objects have the same content.
 
         `self` is this object.
         `other` is the other object.
+        Objects having different data attributes, like partially loaded
+        ones, are different.
 
         """
-        # All public data attributes should be equal for the equality
-        # test to succeed.
-        attr_names = dir(self)
+        attrs = self._data_attrs()
 
-        for cur_attr in attr_names:
-            if not cur_attr.startswith('_'):  # Exclude private attributes.
+        if set(attrs) != set(other._data_attrs()):
+            return False
 
-                attr_val = getattr(self, cur_attr)
-
-                if not callable(attr_val) and \
-                    attr_val != getattr(other, cur_attr):  # Exclude methods.
-                    return False
+        # All public data attributes should be equal for the equality
+        # test to succeed.
+        for cur_attr in attrs:
+            if getattr(self, cur_attr) != getattr(other, cur_attr):
+                return False
 
         return True
 
@@ -77,6 +160,111 @@ class LightObject:
         """
         return not self == other
 
+    def __getstate__(self):
+        """Return the state of this object for serialization.
+
+        `self` is this object.
+        The state is a tuple of the state version and the attributes of
+        this object.
+
+        """
+        return self._STATE_VERSION, self.__dict__
+
+    def __setstate__(self, state):
+        """Restore this object from the given state.
+
+        `self` is this object.
+        `state` is the state previously returned by __getstate__.
+        The method raises a ValueError if the state version isn't
+        supported.
+
+        """
+        version, attrs = state
+
+        if version != self._STATE_VERSION:
+            raise ValueError(
+                "unsupported state version {}".format(version))
+
+        self.__dict__.update(attrs)
+
+    def apply_delta(self, delta, raw_obj=None):
+        """Apply the given changes to this object.
+
+        `self` is this object.
+        `delta` is the changes to apply, as returned by diff.
+        `raw_obj` is the underlying COM object to synchronize with this
+                  object after applying the changes, None to only update
+                  this object.
+
+        """
+        for cur_attr, change in delta.iteritems():
+            if isinstance(change, MapDelta):
+
+                attr_val = getattr(self, cur_attr)
+
+                # Read-only mappings are replaced by patched copies.
+                if not isinstance(attr_val, dict):
+                    attr_val = dict(attr_val)
+
+                attr_val.update(change.changed)
+
+                for key in change.removed:
+                    del attr_val[key]
+
+                setattr(self, cur_attr, attr_val)
+
+            else:
+                setattr(self, cur_attr, change)
+
+        if raw_obj is not None:
+            self.sync(raw_obj)
+
+    def diff(self, other):
+        """Return the changes turning this object into the other one.
+
+        `self` is this object.
+        `other` is the other object, of the same type as this object.
+        The method returns a dictionary mapping every changed public data
+        attribute to its new value. Changed mapping attributes are mapped
+        to MapDelta tuples of their changed items and removed keys
+        instead. Attributes of the other object missing from this one are
+        mapped to their values, while those missing from the other object
+        are left out.
+
+        """
+        if other.__class__ is not self.__class__:
+            raise TypeError("can't compare to a different object type")
+
+        old_attrs = set(self._data_attrs())
+        delta = {}
+
+        for cur_attr in other._data_attrs():
+
+            new_val = getattr(other, cur_attr)
+
+            if cur_attr not in old_attrs:
+                delta[cur_attr] = new_val
+                continue
+
+            old_val = getattr(self, cur_attr)
+
+            if old_val != new_val:
+                delta[cur_attr] = _map_delta(old_val, new_val) if \
+                    isinstance(old_val, collections.Mapping) and isinstance(
+                        new_val, collections.Mapping) else new_val
+
+        return delta
+
+    def _data_attrs(self):
+        """Return the names of the public data attributes.
+
+        `self` is this object.
+
+        """
+        # Exclude private attributes and methods.
+        return [cur_attr for cur_attr in dir(self) if not cur_attr.startswith(
+            '_') and not callable(getattr(self, cur_attr))]
+
 
 class _Wrapper:
 
@@ -91,6 +279,17 @@ class _Wrapper:
         """
         self._raw_obj = raw_obj
 
+    def release(self):
+        """Release the raw object.
+
+        `self` is this wrapper.
+        The wrapper drops its reference to the raw object so that the
+        raw object can be freed even if the wrapper is still referenced.
+        The wrapper mustn't be used afterwards.
+
+        """
+        self._raw_obj = None
+
 
 class ReadOnlyList(_Wrapper):
 
@@ -149,6 +348,18 @@ class ReadOnlyList(_Wrapper):
 
         raise ValueError()
 
+    def release(self):
+        """Release the raw collection and all wrapped objects.
+
+        `self` is this collection of objects.
+
+        """
+        for cur_obj in self._wrapper_list:
+            cur_obj.release()
+
+        self._wrapper_list = []
+        _Wrapper.release(self)
+
 
 class WrapperObject(_Wrapper, object):
 
@@ -171,3 +382,14 @@ class WrapperObject(_Wrapper, object):
 
         """
         return self._raw_obj
+
+def _map_delta(old_map, new_map):
+    """Return the changes turning a mapping into another.
+
+    `old_map` is the original mapping.
+    `new_map` is the changed mapping.
+
+    """
+    return MapDelta(dict((key, val) for key, val in new_map.iteritems() if
+                         key not in old_map or old_map[key] != val),
+                    [key for key in old_map if key not in new_map])
@@ -4,7 +4,7 @@
 
 ############################################################
 #
-# Copyright 2012, 2014, 2015, 2017 Mohammed El-Afifi
+# Copyright 2012, 2014, 2015, 2017, 2026 Mohammed El-Afifi
 # This file is part of pyofficedom.
 #
 # pyofficedom is free software: you can redistribute it and/or modify
@@ -40,34 +40,177 @@
 #
 ############################################################
 
+from array import array
+import bisect
+import codec
+import collections
+import contextlib
 from functools import partial
 import itertools
+import metrics
+import os
 import pythoncom
+import Queue
+import scratch
+import search
+import spans
+import threading
+from timeit import default_timer
 from utils import LightObject, ReadOnlyList, WrapperObject
-from weakref import proxy
+from weakref import proxy, ref, WeakSet
+import win32api
 import win32com.client
+import win32com.server.util
+import win32con
+import win32event
+import win32gui
+import win32process
 NO_OBJ = "none"
+# paragraph mark in document text
+_PARA_MARK = u"\r"
+# default number of characters to read at once from document text
+_TEXT_CHUNK = 1 << 16
+# typecode of writing style codes
+_STYLE_CODE_TYPE = "H"
+_MAX_STYLE_CODE = (1 << 8 * array(_STYLE_CODE_TYPE).itemsize) - 1
+# live applications
+_apps = WeakSet()
+# instance numbers of word sessions
+_instances = itertools.count()
+# serializes starting word processes so that each is told apart from
+# the processes running before it
+_start_lock = threading.Lock()
+_WORD_EXE = "winword.exe"
+# folder of legacy themes shipped with office, by office major version
+_THEMES_DIR = os.path.join("Microsoft Shared", "THEMES{}")
+# replacement of a failed word process, reporting the failure cause
+# ("crashed", "hung" or "timeout"), the documents restored and lost,
+# and the outage time in seconds since detecting the failure
+RecoveryEvent = collections.namedtuple(
+    "RecoveryEvent", ["cause", "recovered", "lost", "downtime"])
+_OP_SECONDS = metrics.REGISTRY.add(metrics.Histogram(
+    "officedom_operation_seconds", "Duration of word document operations",
+    ["instance", "operation"]))
+_COM_ERRORS = metrics.REGISTRY.add(metrics.Counter(
+    "officedom_com_errors_total", "COM errors of word document operations",
+    ["instance", "operation"]))
+_TIMEOUTS = metrics.REGISTRY.add(metrics.Counter(
+    "officedom_call_timeouts_total", "Word operations exceeding timeouts",
+    ["instance"]))
+_RECYCLES = metrics.REGISTRY.add(metrics.Counter(
+    "officedom_recycles_total", "Word process recycles", ["instance"]))
+_TMPL_LOADS = metrics.REGISTRY.add(metrics.Counter(
+    "officedom_template_loads_total", "Templates loaded", ["instance"]))
+_TMPL_CLEANUPS = metrics.REGISTRY.add(metrics.Counter(
+    "officedom_template_cleanups_total", "Stale template purges",
+    ["instance"]))
+_RECOVERIES = metrics.REGISTRY.add(metrics.Counter(
+    "officedom_recoveries_total", "Failed word process recoveries",
+    ["instance", "cause"]))
+# Series of these metrics are removed when quitting their application,
+# so that their number stays bounded.
+_SESSION_METRICS = [_OP_SECONDS, _COM_ERRORS, _TIMEOUTS, _RECYCLES,
+                    _TMPL_LOADS, _TMPL_CLEANUPS, _RECOVERIES]
+# Gauges are collected without touching word, possibly from other
+# threads.
+_OPEN_DOCS = metrics.REGISTRY.add(metrics.Gauge(
+    "officedom_open_documents", "Tracked open documents", ["instance"],
+    lambda: [((app._session.instance,), len(app._docs)) for app in
+             list(_apps)]))
+_LOADED_TMPLS = metrics.REGISTRY.add(metrics.Gauge(
+    "officedom_loaded_templates", "Loaded templates", ["instance"],
+    lambda: [((app._session.instance,), len(app._templates)) for app in
+             list(_apps)]))
+_WRAPPERS = metrics.REGISTRY.add(metrics.Gauge(
+    "officedom_wrappers", "Live document, template and language wrappers",
+    ["instance"], lambda: [((app._session.instance,), len(app._docs) + len(
+        app._templates) + len(app._langs)) for app in list(_apps)]))
 
 class Application(object):
 
     """Word application"""
 
-    def __init__(self):
+    def __init__(self, call_timeout=None, msg_filter=None, recycle=None,
+                 recorder=None, write_behind=None, max_open_docs=None,
+                 index_text=False, tracer=None, watchdog=None,
+                 template_workers=None):
         """Create a word application.
 
         `self` is this application.
+        `call_timeout` is the maximum time in seconds to wait for
+                       opening, adding, saving, or closing documents,
+                       None to wait indefinitely.
+        `msg_filter` is the COM message filter to register for the
+                     calling thread throughout the lifetime of this
+                     application, None to keep the current one.
+        `recycle` is the policy for restarting the word process, None
+                  to never restart it.
+        `recorder` is the recorder to trace all COM calls made through
+                   this application with, None to disable tracing.
+        `write_behind` is the policy for coalescing document saves, None
+                       to save documents immediately.
+        `max_open_docs` is the maximum number of documents kept open in
+                        word, None for no limit. Least recently used
+                        documents beyond the limit are saved if changed
+                        and closed in word, and reopened transparently
+                        when used again.
+        `index_text` is whether to index the text of documents upon
+                     opening and saving them for full-text search.
+        `tracer` is the tracer to emit spans of document, template and
+                 COM operations to, None to disable spans.
+        `watchdog` is the policy for monitoring the health of the word
+                   process, None to disable monitoring.
+        `template_workers` is the number of threads taking snapshots of
+                           the templates loaded upon startup
+                           concurrently, None to take them upfront on
+                           the calling thread. Template snapshots are
+                           then waited for when first used.
         Hook to an active word application instance or start a new one
         if no current one is running.
+        A document operation exceeding the call timeout raises a
+        CallTimeoutError after killing the hung word process and
+        starting a new one. The word process is also restarted when the
+        recycling policy is due and no documents are open. Collections
+        and templates retrieved from this application before a restart
+        are released and have to be retrieved again.
+        With a watchdog, a crashed or hung word process is replaced
+        with the next operation, and the documents tracked by this
+        application are reopened from their files with their snapshots
+        reapplied. Documents never saved to a file are lost.
 
         """
-        app_cls = "Word.Application"
-        self._app = win32com.client.DispatchEx(app_cls)
-        self._docs = _Documents(self._app.Documents)
-        self._langs = _Languages(self._app.Languages)
-        self._templates = _Templates(self._app.Templates, self._docs)
-        self._docs.tmpls = proxy(self._templates)
-        self._normal_tmpl = self._templates.get_wrapper(
-            self._app.NormalTemplate)
+        self._filter_set = msg_filter is not None
+
+        if self._filter_set:
+            self._old_filter = pythoncom.CoRegisterMessageFilter(
+                win32com.server.util.wrap(
+                    msg_filter, pythoncom.IID_IMessageFilter))
+
+        self._recycle = recycle
+        self._write_behind = write_behind
+        self._max_open_docs = max_open_docs
+        self._index_text = index_text
+        self._watchdog = watchdog
+        self._tmpl_workers = template_workers
+
+        # The filter already retries calls made while starting word, but
+        # quitting won't restore the previous one if starting fails.
+        try:
+
+            self._session = _Session(
+                call_timeout, recorder, tracer, watchdog)
+            app_ref = ref(self)
+            self._session.on_failure = lambda: app_ref()._recover()
+            self._wrap()
+
+        except:
+
+            if self._filter_set:
+                pythoncom.CoRegisterMessageFilter(self._old_filter)
+
+            raise
+
+        _apps.add(self)
 
     # context manager support
     def __enter__(self):
@@ -98,9 +241,47 @@ class Application(object):
         `self` is this application.
         Positional and keyword arguments are the same as those accepted
         by the corresponding method in word DOM API.
+        Pending document saves are flushed first. The metric series of
+        this application are removed.
+
+        """
+        with self._session.span("Application.quit"):
+
+            # Documents of a replaced or failed word process are already
+            # lost.
+            if self._generation == self._session.generation and not \
+                    self._session.failure:
+                self._docs.flush()
+
+            _apps.discard(self)
+            self._release()
+            self._session.close(*args, **kwargs)
+
+        for metric in _SESSION_METRICS:
+            metric.remove(self._session.instance)
+
+        if self._filter_set:
+            pythoncom.CoRegisterMessageFilter(self._old_filter)
+
+    @property
+    def call_timeout(self):
+        """Maximum time in seconds to wait for document operations
+
+        `self` is this application.
+
+        """
+        return self._session.timeout
+
+    @call_timeout.setter
+    def call_timeout(self, value):
+        """Set the maximum time to wait for document operations.
+
+        `self` is this application.
+        `value` is the desired timeout in seconds, None to wait
+                indefinitely.
 
         """
-        self._app.Quit(*args, **kwargs)
+        self._session.timeout = value
 
     @property
     def documents(self):
@@ -109,6 +290,7 @@ class Application(object):
         `self` is this application.
 
         """
+        self._refresh()
         return self._docs
 
     @property
@@ -118,6 +300,7 @@ class Application(object):
         `self` is this application.
 
         """
+        self._refresh()
         return self._langs
 
     @property
@@ -127,6 +310,7 @@ class Application(object):
         `self` is this application.
 
         """
+        self._refresh()
         return self._normal_tmpl
 
     @property
@@ -136,31 +320,332 @@ class Application(object):
         `self` is this application.
 
         """
+        self._refresh()
         return self._templates
 
+    @property
+    def themes(self):
+        """Catalog of available themes
+
+        `self` is this application.
+
+        """
+        self._refresh()
+        return self._docs.themes
+
+    def _recover(self):
+        """Replace the failed word process, restoring tracked documents.
+
+        `self` is this application.
+        The recovery event is passed to the watchdog callback, if any.
+
+        """
+        cause = self._session.failure
+
+        with self._session.span("Application.recover", cause=cause):
+
+            docs, pending = self._docs.detach()
+
+            for cur_col in [self._langs, self._templates]:
+                cur_col.release()
+
+            self._session.restart()
+            self._wrap()
+            recovered, lost = self._docs.restore(docs, pending)
+
+        _RECOVERIES.inc(self._session.instance, cause)
+        event = RecoveryEvent(cause, recovered, lost,
+                              default_timer() - self._session.failed_at)
+
+        if self._watchdog.on_recover:
+            self._watchdog.on_recover(event)
+
+    def _refresh(self):
+        """Rewrap the word process if it has been replaced.
+
+        `self` is this application.
+        The word process is recovered first if it has failed, or
+        recycled if the recycling policy is due and no documents are
+        open.
+
+        """
+        if self._session.failure:
+            self._recover()
+
+        if self._recycle and len(self._docs) == 0 and self._recycle.due(
+            self._session):
+            self._session.recycle()
+            _RECYCLES.inc(self._session.instance)
+
+        if self._generation != self._session.generation:
+
+            self._release()
+            self._wrap()
+
+    def _release(self):
+        """Release all collections of this application.
+
+        `self` is this application.
+
+        """
+        for cur_col in [self._docs, self._langs, self._templates]:
+            cur_col.release()
+
+    def _wrap(self):
+        """Wrap the current word process of the session.
+
+        `self` is this application.
+
+        """
+        self._app = self._session.app
+        self._generation = self._session.generation
+        self._docs = _Documents(
+            self._app.Documents, self._session, self._write_behind,
+            self._max_open_docs, self._index_text)
+        self._langs = _Languages(self._app.Languages)
+        self._templates = _Templates(
+            self._app.Templates, self._docs, self._tmpl_workers)
+        self._docs.tmpls = proxy(self._templates)
+        self._normal_tmpl = self._templates.get_wrapper(
+            self._app.NormalTemplate)
+
+
+class CallTimeoutError(Exception):
+
+    """Error raised when a word operation exceeds its timeout"""
+
+
+class RecyclePolicy(object):
+
+    """Word process recycling policy
+
+    Long-running word processes keep growing in memory, so the policy
+    restarts the word process after serving a number of documents or
+    upon exceeding a memory threshold.
+
+    """
+
+    def __init__(self, max_docs=None, max_rss=None):
+        """Create a recycling policy.
+
+        `self` is this recycling policy.
+        `max_docs` is the number of documents opened or added after
+                   which the word process is restarted, None for no
+                   limit.
+        `max_rss` is the resident memory size in bytes of the word
+                  process above which it's restarted, None for no limit.
+
+        """
+        self.max_docs = max_docs
+        self.max_rss = max_rss
+
+    def due(self, session):
+        """Test if the word process of the given session is due.
+
+        `self` is this recycling policy.
+        `session` is the word session to test.
+
+        """
+        return (self.max_docs is not None and
+                session.doc_count >= self.max_docs) or (
+                    self.max_rss is not None and
+                    session.get_rss() > self.max_rss)
+
+
+class WatchdogPolicy(object):
+
+    """Word process health monitoring policy
+
+    A background thread checks the word process periodically, without
+    using COM, and marks it failed if it has exited or its main window
+    doesn't respond within the hang timeout. A hung process is killed.
+    Failed processes are replaced on the thread owning the application
+    with the next operation.
+
+    """
+
+    def __init__(self, interval=5, hang_timeout=30, on_recover=None):
+        """Create a health monitoring policy.
+
+        `self` is this health monitoring policy.
+        `interval` is the time in seconds between checks.
+        `hang_timeout` is the time in seconds the word main window has
+                       to respond within. A single word operation taking
+                       longer is considered a hang as well.
+        `on_recover` is the function to call with a RecoveryEvent after
+                     replacing a failed word process, None to call
+                     nothing.
+
+        """
+        self.interval = interval
+        self.hang_timeout = hang_timeout
+        self.on_recover = on_recover
+
+
+class WriteBehindPolicy(object):
+
+    """Document save coalescing policy
+
+    Saving a document marks it dirty instead of saving it right away.
+    Dirty documents are saved together once the oldest pending save
+    is older than the interval or the number of pending saves reaches
+    the change count. Word documents may only be used from the thread
+    owning them, so due saves are flushed before the next document
+    operation rather than in the background; applications idle for
+    longer than the interval should call flush_due of their document
+    collection periodically.
+
+    """
+
+    def __init__(self, interval=None, max_changes=None):
+        """Create a save coalescing policy.
+
+        `self` is this save coalescing policy.
+        `interval` is the maximum time in seconds a save may be pending,
+                   None for no limit.
+        `max_changes` is the number of pending saves triggering a flush,
+                      None for no limit.
+        Without any limit, pending saves are only flushed explicitly,
+        upon closing documents, or upon quitting the application.
+
+        """
+        self.interval = interval
+        self.max_changes = max_changes
+
+
+class _AutoTextIndex(object):
+
+    """Index of autoText entries across templates
+
+    The index keeps the autoText entry names of all indexed templates
+    sorted by their lower case form, so exact, prefix, and
+    case-insensitive look-ups don't need to scan every template.
+
+    """
+
+    def __init__(self):
+        """Create an empty autoText index.
+
+        `self` is this autoText index.
+
+        """
+        # sorted (lower case name, name, template key) tuples
+        self._keys = []
+        # template key -> (template, names indexed for the template)
+        self._tmpls = {}
+
+    def add(self, tmpl):
+        """Index the autoText entries of the given template.
+
+        `self` is this autoText index.
+        `tmpl` is the template to index.
+        Entries previously indexed for the template are replaced.
+
+        """
+        self.remove(tmpl)
+        key = id(tmpl)
+        names = tuple(tmpl.data.auto_text_entries)
+        self._tmpls[key] = tmpl, names
+        # Sorting merges the sorted run of new keys in linear time.
+        self._keys.extend(sorted((name.lower(), name, key) for name in names))
+        self._keys.sort()
+
+    def find(self, name, prefix=False, ignore_case=False):
+        """Return the entries matching the given name.
+
+        `self` is this autoText index.
+        `name` is the entry name(or name prefix) to look up.
+        `prefix` is True to match entries whose names start with the
+                 given name, False to match the given name exactly.
+        `ignore_case` is True for case-insensitive matching.
+        The method returns a list of (template, entry name) tuples
+        ordered by entry name.
+
+        """
+        folded = name.lower()
+        matches = []
+
+        for idx in xrange(
+                bisect.bisect_left(self._keys, (folded,)), len(self._keys)):
+
+            cur_key = self._keys[idx]
+            folded_match = cur_key[0].startswith(folded) if prefix else \
+                cur_key[0] == folded
+
+            if not folded_match:
+                break
+
+            if ignore_case or (
+                cur_key[1].startswith(name) if prefix else cur_key[1] == name):
+                matches.append((self._tmpls[cur_key[2]][0], cur_key[1]))
+
+        return matches
+
+    def remove(self, tmpl):
+        """Remove the autoText entries of the given template.
+
+        `self` is this autoText index.
+        `tmpl` is the template to remove.
+        The method does nothing if the template isn't indexed.
+
+        """
+        key = id(tmpl)
+
+        if key in self._tmpls:
+
+            del self._tmpls[key]
+            self._keys = [cur_key for cur_key in self._keys if
+                          cur_key[2] != key]
+
+    def update(self, tmpl):
+        """Reindex the given template if it's already indexed.
+
+        `self` is this autoText index.
+        `tmpl` is the template to reindex.
+
+        """
+        if id(tmpl) in self._tmpls:
+            self.add(tmpl)
+
 
 class _Document(WrapperObject):
 
     """Word document
 
     This document class is stateful in the sense that it holds a
-    permanent reference(throughout its lifetime) to the underlying
-    document COM object.
+    permanent reference(until closed or released) to the underlying
+    document COM object. If the document collection limits the number of
+    open documents, the document may be closed in word behind the scenes
+    and reopened from its file when used again.
 
     """
 
-    def __init__(self, doc_list, doc):
+    def __init__(self, doc_list, doc, fields=None):
         """Create a word document.
 
         `self` is this word document.
         `doc_list` is the document collection owning this document. This
                    list is notified upon closing this document.
         `doc` is the underlying COM object representing the document.
+        `fields` are the names of the snapshot fields to load, None to
+                 load all fields.
 
         """
         WrapperObject.__init__(self, doc)
-        self.data = _LightDocument(doc)
+
+        with doc_list.session.span("Document.load_data"):
+            self.data = doc_list.session.call(
+                _LightDocument, doc, doc_list.lang_table, fields,
+                doc_list.themes.names)
+
         self._parent_docs = proxy(doc_list)
+        # scratch file backing this document
+        self._scratch_file = None
+        # file to restore this document from if the word process fails
+        self.recovery_path = None
+
+        if doc_list.session.watchdog:
+            self.track_path()
 
     # context manager support
     def __enter__(self):
@@ -185,28 +670,139 @@ class _Document(WrapperObject):
         """
         self.close()
 
+    def apply_delta(self, delta):
+        """Apply the given changes to this document.
+
+        `self` is this word document.
+        `delta` is the changes to apply, as returned by diffing two
+                document snapshots.
+        The method updates the snapshot of this document and
+        synchronizes it to the underlying COM object without saving.
+
+        """
+        session = self._parent_docs.session
+
+        with session.span("Document.apply_delta"):
+            session.call(self.data.apply_delta, delta, self._use())
+
     def close(self, *args, **kwargs):
         """Close this document.
 
         `self` is this word document.
         Positional and keyword arguments are the same as those accepted
         by the corresponding method in word DOM API.
-        The method notifies the parent document list about closure.
+        The method flushes a pending save of this document, notifies the
+        parent document list about closure and releases the underlying
+        COM object.
+
+        """
+        with self._parent_docs.session.span("Document.close"):
+
+            if self._parent_docs.save_queue:
+                self._parent_docs.save_queue.flush(self)
+
+            self._parent_docs.session.call(
+                self._use().Close, *args, **kwargs)
+            self._parent_docs.remove(self)
+            self.release()
+
+    def evict(self):
+        """Close this document in word, keeping it for reopening.
+
+        `self` is this word document.
+        The document is saved first if changed. The method returns
+        whether the document was closed; documents never saved to a file
+        can't be reopened, so they're kept open. The method isn't
+        intended for direct use by clients.
+
+        """
+        session = self._parent_docs.session
+        path = session.call(self._get_file_name)
+
+        if path is None:
+            return False
+
+        if self._parent_docs.save_queue:
+            self._parent_docs.save_queue.flush(self)
+
+        session.call(self._close_saved)
+        self._com_obj = None
+        self._reopen_path = path
+        return True
+
+    def iter_text(self, chunk_size=_TEXT_CHUNK, paragraphs=False):
+        """Generate the text of this document in chunks.
+
+        `self` is this word document.
+        `chunk_size` is the number of characters read at once.
+        `paragraphs` is whether to generate whole paragraphs, without
+                     their paragraph marks, instead of raw chunks.
+        The text is read in large ranges, so only one chunk(and a
+        paragraph spanning chunks) is held in memory at a time.
+
+        """
+        raw_doc = self._use()
+        end = raw_doc.Content.End
+        tail = u""
+
+        for start in xrange(0, end, chunk_size):
+
+            with self._parent_docs.session.span(
+                "Document.iter_text", start=start):
+                text = raw_doc.Range(start, min(start + chunk_size, end)).Text
+
+            if paragraphs:
+
+                paras = (tail + text).split(_PARA_MARK)
+                tail = paras.pop()
+
+                for cur_para in paras:
+                    yield cur_para
+
+            else:
+                yield text
+
+        if tail:
+            yield tail
+
+    def release(self):
+        """Release the underlying COM object.
+
+        `self` is this word document.
+        The scratch file backing this document, if any, is removed.
+
+        """
+        WrapperObject.release(self)
+        self.set_scratch_file(None)
+
+    def reopen(self, raw_doc):
+        """Rebind this document to the given reopened raw document.
+
+        `self` is this word document.
+        `raw_doc` is the raw document reopened from the file of this
+                  document.
+        The method isn't intended for direct use by clients.
 
         """
-        self._raw_obj.Close(*args, **kwargs)
-        self._parent_docs.remove(self)
+        self._com_obj = raw_doc
+        self._reopen_path = None
 
     def save(self):
         """Save this document.
 
         `self` is this word document.
         The method synchronizes data to the underlying COM object before
-        saving.
+        saving. If the parent document list coalesces saves, the method
+        only marks this document for saving.
 
         """
-        self.data.sync(self._raw_obj)
-        self._raw_obj.Save()
+        with self._parent_docs.session.span("Document.save"):
+            if self._parent_docs.save_queue:
+                self._parent_docs.save_queue.add(self)
+            else:
+
+                self._use()
+                self._parent_docs.session.call(self._save)
 
     def save_as(self, *args, **kwargs):
         """Save this document to the given file.
@@ -218,8 +814,76 @@ class _Document(WrapperObject):
         saving.
 
         """
-        self.data.sync(self._raw_obj)
-        self._raw_obj.SaveAs(*args, **kwargs)
+        session = self._parent_docs.session
+
+        with session.span("Document.save_as"):
+
+            self._use()
+            session.call(self._save_as, *args, **kwargs)
+
+    def save_to_bytes(self, file_format, suffix=""):
+        """Save this document in the given format and return its content.
+
+        `self` is this word document.
+        `file_format` is the word file format to save in.
+        `suffix` is the file name suffix for the format.
+        The document is saved to a scratch file, which backs it from now
+        on like with save_as, and removed when the document is released.
+        The method returns a read-only buffer over a memory map of the
+        saved file.
+
+        """
+        with self._parent_docs.session.span("Document.save_to_bytes"):
+
+            out_file = scratch.get_area().new_file(suffix)
+            self.save_as(out_file, FileFormat=file_format)
+            self.set_scratch_file(out_file)
+            return scratch.map_file(out_file)
+
+    def set_parent(self, doc_list):
+        """Move this document to the given collection.
+
+        `self` is this word document.
+        `doc_list` is the document collection to own this document.
+        The method isn't intended for direct use by clients.
+
+        """
+        self._parent_docs = proxy(doc_list)
+
+    def set_scratch_file(self, file_name):
+        """Set the scratch file backing this document.
+
+        `self` is this word document.
+        `file_name` is the scratch file, None if not backed by one.
+        The previous scratch file, if any, is removed. The method isn't
+        intended for direct use by clients.
+
+        """
+        if self._scratch_file and self._scratch_file != file_name:
+            scratch.get_area().discard(self._scratch_file)
+
+        self._scratch_file = file_name
+
+    def track_path(self):
+        """Record the file to restore this document from.
+
+        `self` is this word document.
+        Documents never saved to a file can't be restored. The method
+        isn't intended for direct use by clients.
+
+        """
+        self.recovery_path = self._get_file_name()
+
+    def wraps(self, raw_doc):
+        """Test if this document wraps the given raw document.
+
+        `self` is this word document.
+        `raw_doc` is the raw document to test.
+        The test doesn't reopen this document if closed behind the
+        scenes. The method isn't intended for direct use by clients.
+
+        """
+        return self._com_obj is not None and self._com_obj == raw_doc
 
     @property
     def attached_template(self):
@@ -237,60 +901,295 @@ class _Document(WrapperObject):
         `self` is this word document.
         `value` is the desired template, its name, or full name.
         The property notifies the parent document list about template
-        change.
+        change. Templates already assigned by the same name are resolved
+        without reading them back from word, and reassigning the
+        attached template doesn't refresh templates.
+
+        """
+        path = str(value)
+        raw_doc = self._use()
+        tmpls = self._parent_docs.tmpls
+        cached = tmpls.resolve(path) if tmpls else None
+
+        # The attached template stays loaded, so nothing is refreshed.
+        if cached and cached[1] == getattr(
+                self.data, "attached_template", None):
+            raw_doc.AttachedTemplate = cached[1]
+        # Cached templates are loaded unless refreshes are deferred, in
+        # which case word may have unloaded them since. The previous
+        # template may have to be purged though.
+        elif cached and not self._parent_docs.refresh_deferred:
+
+            raw_doc.AttachedTemplate = cached[1]
+            self.data.attached_template = cached[1]
+            self._parent_docs.refresh_tmpls()
+
+        else:
+
+            raw_doc.AttachedTemplate = path
+            new_tmpl = raw_doc.AttachedTemplate
+            self.data.attached_template = new_tmpl.FullName
+            self._parent_docs.refresh_tmpls(new_tmpl)
+
+            if tmpls:
+                tmpls.remember(path, new_tmpl, self.data.attached_template)
+
+    @property
+    def full_name(self):
+        """Full path to the document file
+
+        `self` is this word document.
+        A document closed behind the scenes isn't reopened.
 
         """
-        self._raw_obj.AttachedTemplate = str(value)
-        self.data.attached_template = self.raw_obj.AttachedTemplate.FullName
-        self._parent_docs.refresh_tmpls(self._raw_obj.AttachedTemplate)
+        return self._reopen_path.lower() if self._reopen_path is not None \
+            else self._use().FullName.lower()
 
     @property
     def name(self):
         """Lower case document name
 
         `self` is this word document.
+        A document closed behind the scenes isn't reopened.
 
         """
-        return self._raw_obj.Name.lower()
+        return os.path.basename(self._reopen_path).lower() if \
+            self._reopen_path is not None else self._use().Name.lower()
 
+    @property
+    def raw_obj(self):
+        """Wrapped raw object
 
-class _Documents(ReadOnlyList):
+        `self` is this word document.
 
-    """Collection of documents"""
+        """
+        return self._use()
 
-    def __init__(self, docs):
-        """Create a collection of documents.
+    @property
+    def reopen_path(self):
+        """Path to reopen this document from, None if open in word
 
-        `self` is this collection of documents.
-        `docs` are the COM objects representing documents.
+        `self` is this word document.
 
         """
-        ReadOnlyList.__init__(self, docs, partial(_Document, self))
-        self.tmpls = None
+        return self._reopen_path
 
-    def add(self, *args, **kwargs):
-        """Add a new empty document.
+    def _close_saved(self):
+        """Save this document if changed and close it in word.
 
-        `self` is this collection of documents.
-        Positional and keyword arguments are the same as those accepted
-        by the corresponding method in word DOM API.
-        The method returns the new document.
-        If the new document references a template that isn't loaded, the
-        template is loaded.
+        `self` is this word document.
 
         """
-        doc = self._raw_obj.Add(*args, **kwargs)
-        self._load_tmpl(doc.AttachedTemplate)
-        return self._add_new_doc(doc)
+        if not self._com_obj.Saved:
+            self._save()
 
-    def add_raw_doc(self, raw_doc):
-        """Find/Add the raw document and return the wrapper one.
+        self._com_obj.Close()
 
-        `self` is this collection of documents.
-        `raw_doc` is the raw document to find/add.
-        If the document is already open, return its wrapper. Otherwise
-        add it to this collection and return its wrapper. The method
-        isn't intended for direct use by clients.
+    def _get_file_name(self):
+        """Return the full name of the file of this document.
+
+        `self` is this word document.
+        The method returns None for documents never saved to a file.
+
+        """
+        return self._com_obj.FullName if self._com_obj.Path else None
+
+    @property
+    def _raw_obj(self):
+        """Underlying COM object, reopened if closed behind the scenes
+
+        `self` is this word document.
+
+        """
+        if self._reopen_path is not None:
+            self._parent_docs.reopen(self)
+        else:
+            self._parent_docs.touch(self)
+
+        return self._com_obj
+
+    @_raw_obj.setter
+    def _raw_obj(self, value):
+        """Set the underlying COM object.
+
+        `self` is this word document.
+        `value` is the COM object representing the document.
+
+        """
+        self._com_obj = value
+        self._reopen_path = None
+
+    def _save(self):
+        """Synchronize and save this document.
+
+        `self` is this word document.
+
+        """
+        self.data.sync(self._raw_obj)
+        self._raw_obj.Save()
+        self._parent_docs.reindex(self)
+
+    def _save_as(self, *args, **kwargs):
+        """Synchronize and save this document to the given file.
+
+        `self` is this word document.
+        Positional and keyword arguments are the same as those accepted
+        by the corresponding method in word DOM API.
+
+        """
+        self.data.sync(self._raw_obj)
+        self._raw_obj.SaveAs(*args, **kwargs)
+
+        if self._parent_docs.session.watchdog:
+            self.track_path()
+
+        self._parent_docs.reindex(self)
+
+    def _use(self):
+        """Return the underlying COM object for a client operation.
+
+        `self` is this word document.
+        The first access in every client operation counts as a hit if
+        this document is open in word and as a miss if it's reopened,
+        so that internal accesses don't inflate the hit ratio.
+
+        """
+        if self._reopen_path is not None:
+            return self._raw_obj
+
+        self._parent_docs.touch(self, True)
+        return self._com_obj
+
+
+class _Documents(ReadOnlyList):
+
+    """Collection of documents"""
+
+    def __init__(self, docs, session, write_behind=None, max_open=None,
+                 index_text=False):
+        """Create a collection of documents.
+
+        `self` is this collection of documents.
+        `docs` are the COM objects representing documents.
+        `session` is the word session running document operations.
+        `write_behind` is the policy for coalescing document saves, None
+                       to save documents immediately.
+        `max_open` is the maximum number of documents kept open in word,
+                   None for no limit.
+        `index_text` is whether to index the text of documents upon
+                     opening and saving them.
+
+        """
+        self.lang_table = _LanguageTable()
+        self.themes = _ThemeCatalog(session)
+        self.session = session
+        self.save_queue = session.save_queue = _SaveQueue(
+            write_behind, session) if write_behind else None
+        self.max_open = max_open
+        # client operations using documents open in word and reopens of
+        # closed ones
+        self.hits = 0
+        self.misses = 0
+        # documents open in word from the least recently used
+        self._lru = collections.OrderedDict()
+        # full-text index of opened and saved documents
+        self.text_index = search.TextIndex() if index_text else None
+        ReadOnlyList.__init__(self, docs, partial(_Document, self))
+
+        for doc in self._wrapper_list:
+            self._lru[doc] = None
+
+        self.tmpls = None
+        # number of nested deferred template refresh contexts
+        self._deferrals = 0
+        self._pending_cleanup = False
+        self._pending_tmpls = []
+
+    def add(self, *args, **kwargs):
+        """Add a new empty document.
+
+        `self` is this collection of documents.
+        Positional and keyword arguments are the same as those accepted
+        by the corresponding method in word DOM API.
+        The method returns the new document.
+        If the new document references a template that isn't loaded, the
+        template is loaded.
+
+        """
+        with self.session.span("Documents.add"):
+
+            doc = self.session.call(self._raw_obj.Add, *args, **kwargs)
+            self._load_tmpl(doc.AttachedTemplate)
+            return self._add_new_doc(doc)
+
+    def add_many(self, template, count, paths=None):
+        """Generate new documents based on the given template.
+
+        `self` is this collection of documents.
+        `template` is the template itself, its name, or full name.
+        `count` is the number of documents to add.
+        `paths` are the files to save the new documents to, None to keep
+                them open. Paths beyond the given count are ignored.
+        Kept open documents are generated as document wrappers without
+        any loaded snapshot fields; the template is loaded only once.
+        Saved documents are closed right away, even if saving them
+        fails, and their paths are generated instead, without loading
+        the template at all. The method raises a ValueError if fewer
+        paths than documents are given.
+
+        """
+        template = str(template)
+
+        if paths is None:
+            targets = itertools.repeat(None)
+        else:
+
+            targets = list(itertools.islice(paths, count))
+
+            if len(targets) < count:
+                raise ValueError("{} paths given for {} documents".format(
+                    len(targets), count))
+
+        for idx, path in itertools.izip(xrange(count), targets):
+
+            # Only time adding the document, not consuming it.
+            with self.session.span(
+                "Documents.add_many", template=template, path=path):
+
+                doc = self.session.call(self._raw_obj.Add, Template=template)
+
+                if path is None:
+
+                    if not idx:
+                        self._load_tmpl(doc.AttachedTemplate)
+
+                    new_doc = self._add_new_doc(doc, ())
+
+                else:
+
+                    self.session.doc_count += 1
+
+                    # Saved documents have no changes left to discard.
+                    try:
+                        self.session.call(doc.SaveAs, path)
+                    finally:
+                        self.session.call(
+                            doc.Close, constants.wdDoNotSaveChanges)
+
+                    new_doc = path
+
+            yield new_doc
+
+    def add_raw_doc(self, raw_doc, fields=None):
+        """Find/Add the raw document and return the wrapper one.
+
+        `self` is this collection of documents.
+        `raw_doc` is the raw document to find/add.
+        `fields` are the names of the snapshot fields to load for a new
+                 wrapper, None to load all fields.
+        If the document is already open, return its wrapper. Otherwise
+        add it to this collection and return its wrapper. The method
+        isn't intended for direct use by clients.
 
         """
         # Check if the document is already open.
@@ -299,7 +1198,20 @@ class _Documents(ReadOnlyList):
         # This collection doesn't contain the given document, add it and
         # return its wrapper.
         except ValueError:
-            return self._add_new_doc(raw_doc)
+            pass
+
+        # Check if the document was closed behind the scenes.
+        if any(doc.reopen_path is not None for doc in self._wrapper_list):
+
+            path = raw_doc.FullName
+
+            for doc in self._wrapper_list:
+                if doc.reopen_path == path:
+
+                    self._bind(doc, raw_doc)
+                    return doc
+
+        return self._add_new_doc(raw_doc, fields)
 
     def close(self, *args, **kwargs):
         """Close all documents.
@@ -307,12 +1219,157 @@ class _Documents(ReadOnlyList):
         `self` is this collection of documents.
         Positional and keyword arguments are the same as those accepted
         by the corresponding method in word DOM API.
-        The method updates the list of loaded templates as well.
+        The method flushes pending saves first and updates the list of
+        loaded templates as well.
+
+        """
+        with self.session.span("Documents.close"):
+
+            self.flush()
+            self.session.call(self._raw_obj.Close, *args, **kwargs)
+
+            for doc in self._wrapper_list:
+                doc.release()
+
+            self._wrapper_list = []
+            self._lru.clear()
+
+            if self.text_index is not None:
+                self.text_index.clear()
+
+            self._cleanup_tmpls()
+
+    def convert(self, file_name, out_file, file_format, settings=None,
+                cache=None):
+        """Convert the given document file to another format.
+
+        `self` is this collection of documents.
+        `file_name` is the document file to convert.
+        `out_file` is the path to save the converted document to.
+        `file_format` is the target word file format.
+        `settings` is the mapping of document snapshot fields to values
+                   to apply before saving, None to apply nothing.
+        `cache` is the conversion cache to look up and store results
+                in, None to always convert.
+        The document is scanned rather than tracked by this collection,
+        and the method returns whether the result came from the cache.
+        The method raises a ValueError for unknown settings or if the
+        document is already open in this collection.
+
+        """
+        if settings:
+            _LightDocument.check_fields(settings)
+
+        with self.session.span("Documents.convert", file_name=file_name,
+                               file_format=file_format):
+
+            if cache:
+
+                key = cache.get_key(file_name, file_format, settings)
+
+                if cache.get(key, out_file):
+                    return True
+
+            doc = self.open(file_name, fields=(), scan=True)
+
+            # Converting would retarget and close the open document.
+            if not isinstance(doc, _ScanDocument):
+                raise ValueError(
+                    "document already open: {}".format(file_name))
+
+            with doc:
+
+                for field, value in (settings or {}).iteritems():
+                    setattr(doc.data, field, value)
+
+                doc.save_as(out_file, FileFormat=file_format)
+
+            if cache:
+                cache.put(key, out_file)
+
+            return False
+
+    @contextlib.contextmanager
+    def deferred_template_refresh(self):
+        """Defer refreshing templates until the end of the context.
+
+        `self` is this collection of documents.
+        Template changes and document closures within the context only
+        queue the templates to load and purge, which are reconciled once
+        upon leaving the outermost context. Loaded templates may be
+        stale until then.
+
+        """
+        self._deferrals += 1
+
+        try:
+            yield
+        finally:
+
+            self._deferrals -= 1
+
+            if not self._deferrals:
+                self._reconcile_tmpls()
+
+    def detach(self):
+        """Release this collection, keeping the wrapped documents.
+
+        `self` is this collection of documents.
+        The method returns the list of documents and the list of those
+        with pending saves, for restoring them in another collection.
+        The method isn't intended for direct use by clients.
 
         """
-        self._raw_obj.Close(*args, **kwargs)
+        docs = self._wrapper_list
+        pending = [doc for doc in docs if
+                   self.save_queue and doc in self.save_queue]
         self._wrapper_list = []
-        self.tmpls.cleanup()
+        self.release()
+        return docs, pending
+
+    def flush(self):
+        """Save all documents with pending saves.
+
+        `self` is this collection of documents.
+
+        """
+        if self.save_queue:
+            with self.session.span("Documents.flush"):
+                self.save_queue.flush()
+
+    def flush_due(self):
+        """Save the documents with pending saves that are due.
+
+        `self` is this collection of documents.
+        Pending saves can't be flushed in the background, so services
+        coalescing saves with an interval should call this method on
+        the thread owning the application whenever they're idle for
+        longer than the interval. The method returns the time in seconds
+        until the pending saves are due, None if no save is pending an
+        interval.
+
+        """
+        if not self.save_queue:
+            return None
+
+        with self.session.span("Documents.flush_due"):
+            return self.save_queue.poll()
+
+    def get_wrapper(self, raw_obj):
+        """Return the document wrapping the given raw one.
+
+        `self` is this collection of documents.
+        `raw_obj` is the raw document to get whose wrapper.
+        The method raises a ValueError if no document wraps the given
+        raw one. Documents closed behind the scenes aren't reopened.
+
+        """
+        with self.session.span("Documents.get_wrapper"):
+            for cur_doc in self._wrapper_list:
+                if cur_doc.wraps(raw_obj):
+                    return cur_doc
+
+        raise ValueError()
 
     def open(self, file_name, *args, **kwargs):
         """Open the given document file and return it.
@@ -320,26 +1377,118 @@ class _Documents(ReadOnlyList):
         `self` is this collection of documents.
         `file_name` is the file to open.
         Positional and keyword arguments are the same as those accepted
-        by the corresponding method in word DOM API.
+        by the corresponding method in word DOM API, except for these
+        optional keyword arguments:
+        - `fields` names the snapshot fields to load, all fields by
+          default. Accessing a field that wasn't loaded raises an
+          AttributeError.
+        - `scan` opens the document read-only for inspection if true.
+          Scanned documents aren't added to the recent files, their
+          templates aren't loaded and they aren't tracked by this
+          collection, so closing them doesn't purge templates.
         The method takes care of not opening the same document twice. If
         the requested document references a template that isn't loaded,
         the template is loaded.
 
         """
-        doc = self._raw_obj.Open(file_name, *args, **kwargs)
-        self._load_tmpl(doc.AttachedTemplate)
-        return self.add_raw_doc(doc)
+        fields = kwargs.pop("fields", None)
+        scan = kwargs.pop("scan", False)
+
+        if fields is not None:
+            _LightDocument.check_fields(fields)
+
+        if scan:
+
+            kwargs.setdefault("ReadOnly", True)
+            kwargs.setdefault("AddToRecentFiles", False)
+
+        with self.session.span("Documents.open", file_name=file_name):
+
+            doc = self.session.call(
+                self._raw_obj.Open, file_name, *args, **kwargs)
+
+            if scan:
+                return self._scan_raw_doc(doc, fields)
+
+            self._load_tmpl(doc.AttachedTemplate)
+            doc = self.add_raw_doc(doc, fields)
+
+            if self.text_index is not None and doc not in self.text_index:
+                self.reindex(doc)
+
+            return doc
+
+    def open_from_bytes(self, data, suffix="", **kwargs):
+        """Open a document from the given content and return it.
+
+        `self` is this collection of documents.
+        `data` is the document file content.
+        `suffix` is the file name suffix for the content format.
+        Keyword arguments are the same as those accepted by open.
+        The content is staged through a scratch file, which backs the
+        document and is removed when the document is released.
+
+        """
+        with self.session.span("Documents.open_from_bytes", size=len(data)):
+
+            in_file = scratch.get_area().new_file(suffix)
+
+            with open(in_file, "wb") as out_stream:
+                out_stream.write(data)
+
+            doc = self.open(in_file, **kwargs)
+            doc.set_scratch_file(in_file)
+            return doc
 
-    def refresh_tmpls(self, new_tmpl):
+    def refresh_tmpls(self, new_tmpl=None):
         """Load the given template and purge stale ones.
 
         `self` is this collection of documents.
-        `new_tmpl` is the raw template to load.
+        `new_tmpl` is the raw template to load, None if already loaded.
         The method isn't intended for direct use by clients.
 
         """
-        self.tmpls.cleanup()
-        self._load_tmpl(new_tmpl)
+        if self._deferrals:
+
+            self._pending_cleanup = True
+
+            if new_tmpl is not None and new_tmpl not in self._pending_tmpls:
+                self._pending_tmpls.append(new_tmpl)
+
+        else:
+
+            self.tmpls.cleanup()
+
+            if new_tmpl is not None:
+                self._load_tmpl(new_tmpl)
+
+    def reindex(self, doc):
+        """Index the current text of the given document.
+
+        `self` is this collection of documents.
+        `doc` is the document to index.
+        The method does nothing unless text indexing is enabled. Scanned
+        documents aren't tracked by this collection, so they aren't
+        indexed either. The method isn't intended for direct use by
+        clients.
+
+        """
+        if self.text_index is not None and not isinstance(
+                doc, _ScanDocument):
+            self.text_index.add(doc, doc.iter_text(paragraphs=True))
+
+    def release(self):
+        """Release the raw collection and all wrapped documents.
+
+        `self` is this collection of documents.
+        Pending saves are discarded.
+
+        """
+        if self.save_queue:
+            self.save_queue = self.session.save_queue = None
+
+        self._lru.clear()
+        ReadOnlyList.release(self)
 
     def remove(self, doc):
         """Remove the given document from this collection.
@@ -351,7 +1500,79 @@ class _Documents(ReadOnlyList):
 
         """
         self._wrapper_list.remove(doc)
-        self.tmpls.cleanup()
+        self._lru.pop(doc, None)
+
+        if self.text_index is not None:
+            self.text_index.remove(doc)
+
+        self._cleanup_tmpls()
+
+    def reopen(self, doc):
+        """Reopen the given document closed behind the scenes.
+
+        `self` is this collection of documents.
+        `doc` is the document to reopen.
+        The method isn't intended for direct use by clients.
+
+        """
+        with self.session.span("Documents.reopen", file_name=doc.reopen_path):
+            self._bind(doc, self.session.call(
+                self._raw_obj.Open, doc.reopen_path))
+
+    def restore(self, docs, pending):
+        """Restore the given documents of a failed word process.
+
+        `self` is this collection of documents.
+        `docs` are the documents to restore.
+        `pending` are the documents with pending saves.
+        Documents are reopened from their files and their snapshots are
+        reapplied, so only changes made directly through COM objects are
+        lost. Documents closed behind the scenes are left for reopening
+        when used. Documents never saved to a file, or whose files fail
+        to open, are released. The method returns the list of restored
+        documents and the list of lost ones. The method isn't intended
+        for direct use by clients.
+
+        """
+        recovered = []
+        lost = []
+
+        for doc in docs:
+
+            raw_doc = None
+
+            # Documents closed behind the scenes were saved first.
+            if doc.reopen_path is None and doc.recovery_path:
+                try:
+                    raw_doc = self.session.call(
+                        self._raw_obj.Open, doc.recovery_path)
+                except pythoncom.com_error:
+                    pass
+
+            if doc.reopen_path is None and raw_doc is None:
+
+                doc.release()
+                lost.append(doc)
+                continue
+
+            doc.set_parent(self)
+            self._wrapper_list.append(doc)
+            recovered.append(doc)
+
+            if doc.reopen_path is None:
+
+                self.session.doc_count += 1
+                doc.reopen(raw_doc)
+                self.session.call(doc.data.sync, raw_doc)
+                self._load_tmpl(raw_doc.AttachedTemplate)
+                self._lru[doc] = None
+                self.reindex(doc)
+
+                if self.save_queue and doc in pending:
+                    self.save_queue.add(doc)
+
+        self._evict()
+        return recovered, lost
 
     def save(self, *args, **kwargs):
         """Save all documents.
@@ -359,60 +1580,199 @@ class _Documents(ReadOnlyList):
         `self` is this collection of documents.
         Positional and keyword arguments are the same as those accepted
         by the corresponding method in word DOM API.
+        Pending saves are flushed first.
+
+        """
+        with self.session.span("Documents.save"):
+
+            self.flush()
+            self.session.call(self._raw_obj.Save, *args, **kwargs)
+
+    def touch(self, doc, hit=False):
+        """Mark the given document as the most recently used.
+
+        `self` is this collection of documents.
+        `doc` is the used document.
+        `hit` is whether a client operation used the document, counting
+              as a hit.
+        The method isn't intended for direct use by clients.
+
+        """
+        if doc in self._lru:
+
+            self._lru[doc] = self._lru.pop(doc)
+
+            if hit:
+                self.hits += 1
+
+    @property
+    def refresh_deferred(self):
+        """Whether template refreshes are currently deferred
+
+        `self` is this collection of documents.
 
         """
-        self._raw_obj.Save(*args, **kwargs)
+        return self._deferrals > 0
 
-    def _add_new_doc(self, raw_doc):
+    def _add_new_doc(self, raw_doc, fields=None):
         """Add a new raw document and return the wrapper one.
 
         `self` is this collection of documents.
         `raw_doc` is the new document to add.
+        `fields` are the names of the snapshot fields to load, None to
+                 load all fields.
         The method will always add a new wrapper for the given document
         even if one already exists.
 
         """
-        self._wrapper_list.append(_Document(self, raw_doc))
+        self.session.doc_count += 1
+        self._wrapper_list.append(_Document(self, raw_doc, fields))
+        self._lru[self._wrapper_list[-1]] = None
+        self._evict()
         return self._wrapper_list[-1]
 
-    def _load_tmpl(self, raw_tmpl):
-        """Load the raw template(if necessary).
+    def _bind(self, doc, raw_doc):
+        """Rebind a document closed behind the scenes.
 
         `self` is this collection of documents.
-        `raw_tmpl` is the raw template to load.
+        `doc` is the document to rebind.
+        `raw_doc` is the raw document reopened from its file.
 
         """
-        if self.tmpls:
-            # Check if the template is already loaded.
-            try:
-                self.tmpls.get_wrapper(raw_tmpl)
-            except ValueError:  # The template isn't loaded, load it.
-                self.tmpls.add(_Template(self, raw_tmpl))
+        self.session.doc_count += 1
+        self.misses += 1
+        doc.reopen(raw_doc)
+        self._load_tmpl(raw_doc.AttachedTemplate)
+        self._lru[doc] = None
+        self._evict()
 
+    def _cleanup_tmpls(self):
+        """Purge stale templates, unless deferred.
 
-class _Language(WrapperObject):
+        `self` is this collection of documents.
 
-    """language information"""
+        """
+        if self._deferrals:
+            self._pending_cleanup = True
+        else:
+            self.tmpls.cleanup()
 
-    def __init__(self, lang):
-        """Create a language.
+    def _evict(self):
+        """Close least recently used documents beyond the limit.
 
-        `self` is this language.
-        `lang` is the underlying COM object representing the language.
+        `self` is this collection of documents.
 
         """
-        WrapperObject.__init__(self, lang)
+        if self.max_open is None:
+            return
 
-    def __getattr__(self, name):
-        """Support language properties.
+        evicted = False
 
-        `self` is this language.
-        `name` is the attribute.
+        for doc in self._lru.keys()[:-1]:
 
-        """
-        prop_map = {"id": "ID", "name": "Name", "name_local": "NameLocal"}
+            if len(self._lru) <= self.max_open:
+                break
 
-        if name in prop_map:
+            # Documents stay tracked until closed, so that those failing
+            # to close are evicted again later.
+            if doc.evict():
+
+                del self._lru[doc]
+                evicted = True
+
+            else:  # Documents that can't be closed become the most recent.
+                self._lru[doc] = self._lru.pop(doc)
+
+        if evicted:
+            self._cleanup_tmpls()
+
+    def _load_tmpl(self, raw_tmpl):
+        """Load the raw template(if necessary).
+
+        `self` is this collection of documents.
+        `raw_tmpl` is the raw template to load.
+
+        """
+        if not self.tmpls:
+            return
+
+        with self.session.span("Documents.load_template") as attrs:
+            # Check if the template is already loaded.
+            try:
+                self.tmpls.get_wrapper(raw_tmpl)
+            except ValueError:  # The template isn't loaded, load it.
+
+                tmpl = _Template(self, raw_tmpl)
+                self.tmpls.add(tmpl)
+                _TMPL_LOADS.inc(self.session.instance)
+
+                if attrs is not None:
+                    attrs["template"] = tmpl.full_name
+
+    def _reconcile_tmpls(self):
+        """Apply template refreshes deferred so far.
+
+        `self` is this collection of documents.
+
+        """
+        if self._pending_cleanup:
+            self.tmpls.cleanup()
+
+        # Only load templates still referenced after all the deferred
+        # changes.
+        if self._pending_tmpls:
+
+            raw_tmpls = self.tmpls.raw_templates()
+
+            for cur_tmpl in self._pending_tmpls:
+                if cur_tmpl in raw_tmpls:
+                    self._load_tmpl(cur_tmpl)
+
+        self._pending_cleanup = False
+        self._pending_tmpls = []
+
+    def _scan_raw_doc(self, raw_doc, fields):
+        """Return a scanned document for the given raw document.
+
+        `self` is this collection of documents.
+        `raw_doc` is the raw document opened for scanning.
+        `fields` are the names of the snapshot fields to load, None to
+                 load all fields.
+        If the document is already open in this collection, its wrapper
+        is returned instead, so that scanning doesn't close it.
+
+        """
+        try:
+            return self.get_wrapper(raw_doc)
+        except ValueError:
+
+            self.session.doc_count += 1
+            return _ScanDocument(self, raw_doc, fields)
+
+
+class _Language(WrapperObject):
+
+    """language information"""
+
+    def __init__(self, lang):
+        """Create a language.
+
+        `self` is this language.
+        `lang` is the underlying COM object representing the language.
+
+        """
+        WrapperObject.__init__(self, lang)
+
+    def __getattr__(self, name):
+        """Support language properties.
+
+        `self` is this language.
+        `name` is the attribute.
+
+        """
+        prop_map = {"id": "ID", "name": "Name", "name_local": "NameLocal"}
+
+        if name in prop_map:
 
             attr_val = getattr(self._raw_obj, prop_map[name])
             return attr_val.__class__(str(attr_val).lower())
@@ -420,180 +1780,1061 @@ class _Language(WrapperObject):
         raise AttributeError()
 
 
+class _LanguageTable(object):
+
+    """Table of language keys and writing styles
+
+    Documents of the same application share a language table, so that
+    language keys and writing style strings are stored only once while
+    each document keeps only a compact array of style codes.
+
+    """
+
+    def __init__(self):
+        """Create an empty language table.
+
+        `self` is this language table.
+
+        """
+        # language IDs by slot, None until loaded
+        self.ids = None
+        # unique language keys in slot order
+        self.keys = []
+        # language key -> slots
+        self._slots = {}
+        # style strings by code - 1
+        self._styles = []
+        # style string -> code
+        self._codes = {}
+
+    def get_slots(self, key):
+        """Return the slots of languages having the given key.
+
+        `self` is this language table.
+        `key` is the lower case language ID, name, or local name.
+
+        """
+        return self._slots.get(key, ())
+
+    def get_style(self, code):
+        """Return the writing style of the given code.
+
+        `self` is this language table.
+        `code` is the writing style code.
+
+        """
+        return self._styles[code - 1]
+
+    def load(self, langs):
+        """Load the keys of the given languages if not already loaded.
+
+        `self` is this language table.
+        `langs` are the COM objects representing languages.
+
+        """
+        if self.ids is not None:
+            return
+
+        self.ids = []
+
+        for slot, lang in enumerate(langs):
+
+            self.ids.append(lang.ID)
+
+            for attr_val in [lang.ID, lang.Name, lang.NameLocal]:
+
+                key = attr_val.__class__(str(attr_val).lower())
+
+                if key not in self._slots:
+
+                    self._slots[key] = ()
+                    self.keys.append(key)
+
+                self._slots[key] += slot,
+
+    def style_code(self, style):
+        """Return the code of the given writing style.
+
+        `self` is this language table.
+        `style` is the lower case writing style.
+        Codes start at one; zero means no writing style. The method
+        raises a ValueError if the table can't hold more writing styles.
+
+        """
+        if style not in self._codes:
+
+            if len(self._styles) == _MAX_STYLE_CODE:
+                raise ValueError("too many distinct writing styles")
+
+            self._styles.append(style)
+            self._codes[style] = len(self._styles)
+
+        return self._codes[style]
+
+
 class _Languages(ReadOnlyList):
 
     """Collection of languages"""
 
-    def __init__(self, langs):
-        """Create a collection of languages.
+    def __init__(self, langs):
+        """Create a collection of languages.
+
+        `self` is this collection of languages.
+        `docs` are the COM objects representing languages.
+
+        """
+        ReadOnlyList.__init__(self, langs, _Language)
+
+    def Item(self, index):
+        """Return the language at the specified index.
+
+        `self` is this collection of languages.
+        `index` is the language ID, name, or local name.
+
+        """
+        return self.get_wrapper(self._raw_obj(index))
+
+    def get_wrapper(self, raw_obj):
+        """Return the wrapper language for the given raw one.
+
+        `self` is this collection of languages.
+        `raw_obj` is the raw language to get whose wrapper.
+        The method raises a ValueError if no language wraps the given
+        raw one.
+
+        """
+        # Check if the language is wrapped.
+        for cur_lang in self._wrapper_list:
+            # Comparison is based on ID's.
+            if cur_lang.raw_obj.ID == raw_obj.ID:
+                return cur_lang
+
+        raise ValueError()
+
+
+@codec.register("word.document")
+class _LightDocument(LightObject, object):
+
+    """Lightweight word document
+
+    This document class is stateless; it doesn't hold a reference to the
+    underlying document COM object.
+
+    """
+
+    # attribute names by field name
+    _FIELDS = {"active_theme": "_active_theme",
+               "active_writing_style": "_styles",
+               "attached_template": "_tmpl"}
+
+    def __init__(self, doc, lang_table=None, fields=None, themes=None):
+        """Create a lightweight word document.
+
+        `self` is this word document.
+        `doc` is the underlying COM object representing the document.
+        `lang_table` is the language table shared by documents of the
+                     same application, None to use a private one.
+        `fields` are the names of the fields to load, None to load all
+                 fields. Only loaded fields are read from the COM object,
+                 compared and synchronized back.
+        `themes` are the catalog names of the themes to resolve active
+                 theme changes against by their lower case form, None or
+                 empty to accept any theme.
+
+        """
+        if fields is None:
+            fields = self._FIELDS
+        else:
+            self.check_fields(fields)
+
+        if themes:
+            self._themes = themes
+
+        if "active_theme" in fields:
+            self._active_theme = doc.ActiveTheme
+
+        if "attached_template" in fields:
+            self._tmpl = doc.AttachedTemplate.FullName
+
+        if "active_writing_style" in fields:
+            self._styles = self._load_styles(doc, lang_table)
+
+    def __getattr__(self, name):
+        """Report fields that weren't loaded.
+
+        `self` is this word document.
+        `name` is the name of the missing attribute.
+
+        """
+        raise AttributeError("field {} wasn't loaded".format(
+            name) if name in self._FIELDS else
+            "'{}' object has no attribute '{}'".format(
+                self.__class__.__name__, name))
+
+    def __getstate__(self):
+        """Return the state of this document for serialization.
+
+        `self` is this word document.
+        Writing styles are stored as a plain dictionary.
+
+        """
+        version, attrs = LightObject.__getstate__(self)
+        attrs = dict(attrs)
+        attrs.pop("_themes", None)
+
+        if "_styles" in attrs:
+            attrs["active_writing_style"] = dict(attrs.pop("_styles"))
+
+        return version, attrs
+
+    def __setstate__(self, state):
+        """Restore this document from the given state.
+
+        `self` is this word document.
+        `state` is the state previously returned by __getstate__.
+        Restored documents aren't attached to a language table and don't
+        know the available themes, so they keep their writing styles in
+        a plain dictionary and accept any theme.
+
+        """
+        version, attrs = state
+        attrs = dict(attrs)
+
+        if "active_writing_style" in attrs:
+            attrs["_styles"] = attrs.pop("active_writing_style")
+
+        LightObject.__setstate__(self, (version, attrs))
+
+    @classmethod
+    def check_fields(cls, fields):
+        """Verify that the given field names are known.
+
+        `cls` is the lightweight document class.
+        `fields` are the field names to verify.
+        The method raises a ValueError for unknown field names. The
+        method isn't intended for direct use by clients.
+
+        """
+        unknown = set(fields).difference(cls._FIELDS)
+
+        if unknown:
+            raise ValueError(
+                "unknown fields: {}".format(", ".join(sorted(unknown))))
+
+    def sync(self, doc):
+        """Update the underlying COM object.
+
+        `self` is this word document.
+        `doc` is the underlying COM object to update.
+        Only loaded fields are synchronized. The method isn't intended
+        for direct use by clients.
+
+        """
+        if "_active_theme" in self.__dict__:
+            if self.active_theme == NO_OBJ:
+                doc.RemoveTheme()
+            else:
+                doc.ApplyTheme(self._active_theme)
+
+        # The active writing style property can't be updated.
+        if "_tmpl" in self.__dict__:
+            doc.AttachedTemplate = self._tmpl
+
+    @property
+    def active_theme(self):
+        """Active theme
+
+        `self` is this word document.
+
+        """
+        return self._active_theme.lower()  # lower case
+
+    @active_theme.setter
+    def active_theme(self, value):
+        """Set the active theme for this document.
+
+        `self` is this word document.
+        `value` is the desired active theme.
+        The theme is resolved case-insensitively to its catalog form
+        among the themes available when the document was loaded, if
+        known, raising a ValueError for unknown themes.
+
+        """
+        self._active_theme = _ThemeCatalog.resolve(
+            self.__dict__.get("_themes"), value)
+
+    @property
+    def active_writing_style(self):
+        """Read-only mapping of languages to their writing styles
+
+        `self` is this word document.
+        Languages may be looked up by their lower case ID, name, or
+        local name.
+
+        """
+        return self._styles
+
+    @active_writing_style.setter
+    def active_writing_style(self, value):
+        """Replace the writing styles of this document.
+
+        `self` is this word document.
+        `value` is the desired mapping of languages to writing styles.
+
+        """
+        styles = self.__dict__.get("_styles")
+        self._styles = styles.replace(value) if isinstance(
+            styles, _WritingStyles) else dict(value)
+
+    @property
+    def attached_template(self):
+        """Reference template full name
+
+        `self` is this word document.
+
+        """
+        return self._tmpl.lower()  # lower case
+
+    @attached_template.setter
+    def attached_template(self, value):
+        """Set the reference template for this document.
+
+        `self` is this word document.
+        `value` is the desired template itself or its full name.
+
+        """
+        self._tmpl = str(value)
+
+    def _data_attrs(self):
+        """Return the names of the loaded fields.
+
+        `self` is this word document.
+
+        """
+        return sorted(field for field, attr in self._FIELDS.iteritems() if
+                      attr in self.__dict__)
+
+    @staticmethod
+    def _load_styles(doc, lang_table):
+        """Return the writing styles of the given document.
+
+        `doc` is the underlying COM object representing the document.
+        `lang_table` is the language table shared by documents of the
+                     same application, None to use a private one.
+
+        """
+        if not lang_table:
+            lang_table = _LanguageTable()
+
+        lang_table.load(doc.Application.Languages)
+        codes = array(_STYLE_CODE_TYPE, [0]) * len(lang_table.ids)
+
+        with spans.span("LightDocument.load_styles",
+                        languages=len(lang_table.ids)):
+            for slot, lang_id in enumerate(lang_table.ids):
+                try:  # sorry, no clean way to know available languages
+                    style = doc.ActiveWritingStyle(lang_id)
+                except pythoncom.com_error:
+                    pass
+                else:
+                    codes[slot] = lang_table.style_code(style.lower())
+
+        return _WritingStyles(lang_table, codes)
+
+
+@codec.register("word.template")
+class _LightTemplate(LightObject):
+
+    """Lightweight word template
+
+    This template class is stateless; it doesn't hold a reference to the
+    underlying template COM object.
+
+    """
+
+    def __init__(self, tmpl):
+        """Create a lightweight word template.
+
+        `self` is this word template.
+        `tmpl` is the underlying COM object representing the template.
+
+        """
+        self.auto_text_entries = dict(
+            (entry.Name, entry.Value) for entry in tmpl.AutoTextEntries)
+
+    def sync(self, tmpl):
+        """Update the underlying COM object.
+
+        `self` is this word template.
+        `tmpl` is the underlying COM object to update.
+
+        """
+        # Rewrite the autoText entries of the raw template.
+        for entry in tmpl.AutoTextEntries:
+            entry.Delete()
+
+        entries = self.auto_text_entries.iteritems()
+
+        for name, val in entries:
+            tmpl.AutoTextEntries.Add(
+                name, tmpl.Application.Selection.Range).Value = val
+
+
+class _Monitor(threading.Thread):
+
+    """Thread checking the health of a word process"""
+
+    def __init__(self, session, interval):
+        """Create a health monitoring thread.
+
+        `self` is this monitoring thread.
+        `session` is the word session to monitor.
+        `interval` is the time in seconds between checks.
+
+        """
+        threading.Thread.__init__(self, name="officedom watchdog")
+        self.daemon = True
+        self._session = session
+        self._interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Check the word process until stopped or failed.
+
+        `self` is this monitoring thread.
+
+        """
+        while not self._stopped.wait(self._interval):
+
+            cause = self._session.check()
+
+            # A process quit while stopping isn't a failure.
+            if cause and not self._stopped.is_set():
+
+                self._session.fail(cause)
+                return
+
+    def stop(self):
+        """Stop monitoring, waiting for a running check to finish.
+
+        `self` is this monitoring thread.
+
+        """
+        self._stopped.set()
+        self.join()
+
+
+class _SaveQueue(object):
+
+    """Queue of pending document saves
+
+    Word documents may only be used from the thread that owns them, so
+    the queue doesn't flush from a separate thread. Instead, due saves
+    are flushed on the owning thread before the next document
+    operation of the session, upon polling, or explicitly.
+
+    """
+
+    def __init__(self, policy, session):
+        """Create an empty save queue.
+
+        `self` is this save queue.
+        `policy` is the policy for coalescing saves.
+        `session` is the word session running document operations.
+
+        """
+        self._policy = policy
+        self._session = session
+        self._docs = []
+        # pending saves, including repeated ones
+        self._changes = 0
+        self._deadline = None
+        self._flushing = False
+
+    def __contains__(self, doc):
+        """Test if the given document has a pending save.
+
+        `self` is this save queue.
+        `doc` is the document to test.
+
+        """
+        return doc in self._docs
+
+    def add(self, doc):
+        """Mark the given document for saving.
+
+        `self` is this save queue.
+        `doc` is the document to save.
+
+        """
+        if doc not in self._docs:
+            self._docs.append(doc)
+
+        if self._deadline is None and self._policy.interval is not None:
+            self._deadline = default_timer() + self._policy.interval
+
+        self._changes += 1
+
+        if self._policy.max_changes is not None and \
+                self._changes >= self._policy.max_changes:
+            self.flush()
+
+    def flush(self, doc=None):
+        """Save the pending documents.
+
+        `self` is this save queue.
+        `doc` is the only document to save, None to save all pending
+              documents.
+        The method isn't intended for direct use by clients.
+
+        """
+        docs = self._docs if doc is None else [doc]
+        self._flushing = True
+
+        try:
+            for cur_doc in list(docs):
+                if cur_doc in self._docs:
+
+                    self._session.call(cur_doc._save)
+                    self._docs.remove(cur_doc)
+
+        finally:
+            self._flushing = False
+
+        if not self._docs:
+
+            self._changes = 0
+            self._deadline = None
+
+    def poll(self):
+        """Flush the pending documents if due.
+
+        `self` is this save queue.
+        The method returns the time in seconds until the pending
+        documents are due, None if no interval applies to them.
+
+        """
+        if not self._flushing and self._deadline is not None and \
+                default_timer() >= self._deadline:
+            self.flush()
+
+        return None if self._deadline is None else max(
+            self._deadline - default_timer(), 0)
+
+
+class _ScanDocument(_Document):
+
+    """Word document opened for scanning
+
+    Scanned documents are opened read-only. They aren't tracked by their
+    document collection, so closing them skips template reconciliation.
+
+    """
+
+    def __init__(self, doc_list, doc, fields=None):
+        """Create a scanned word document.
+
+        `self` is this scanned document.
+        `doc_list` is the document collection that opened this document.
+        `doc` is the underlying COM object representing the document.
+        `fields` are the names of the snapshot fields to load, None to
+                 load all fields.
+
+        """
+        _Document.__init__(self, doc_list, doc, fields)
+
+    def close(self, *args, **kwargs):
+        """Close this document.
+
+        `self` is this scanned document.
+        Positional and keyword arguments are the same as those accepted
+        by the corresponding method in word DOM API.
+        The method flushes a pending save of this document and releases
+        the underlying COM object.
+
+        """
+        if self._parent_docs.save_queue:
+            self._parent_docs.save_queue.flush(self)
+
+        self._parent_docs.session.call(self._raw_obj.Close, *args, **kwargs)
+        self.release()
+
+
+class _Session(object):
+
+    """Word process session
+
+    The session owns the word process backing an application. It runs
+    document operations with a timeout, killing and replacing the word
+    process if an operation hangs.
+
+    """
+
+    def __init__(self, timeout, recorder, tracer=None, watchdog=None):
+        """Create a word session.
+
+        `self` is this session.
+        `timeout` is the maximum time in seconds to wait for operations,
+                  None to wait indefinitely.
+        `recorder` is the recorder to trace COM calls with, None to
+                   disable tracing.
+        `tracer` is the tracer to emit operation spans to, None to
+                 disable spans.
+        `watchdog` is the policy for monitoring the word process, None
+                   to disable monitoring.
+
+        """
+        self.timeout = timeout
+        self._recorder = recorder
+        self.tracer = tracer
+        self.watchdog = watchdog
+        # cause and time of the word process failure, None if healthy
+        self.failure = None
+        self.failed_at = None
+        # function replacing a failed word process
+        self.on_failure = None
+        self._monitor = None
+        # queue of pending document saves
+        self.save_queue = None
+        # label distinguishing this session in metrics
+        self.instance = str(next(_instances))
+        # word process incarnation, increased upon replacing the process
+        self.generation = 0
+        self._start()
+
+    def call(self, func, *args, **kwargs):
+        """Run the given operation and return its result.
+
+        `self` is this session.
+        `func` is the operation to run.
+        Positional and keyword arguments are passed to the operation.
+        The method raises a CallTimeoutError if the operation doesn't
+        complete within the session timeout. The word process is killed
+        and replaced in this case. A failed word process is recovered
+        and pending document saves that are due are flushed first. The
+        method isn't intended for direct use by clients.
+
+        """
+        if self.failure and self.on_failure:
+            self.on_failure()
+
+        if self.save_queue:
+            self.save_queue.poll()
+
+        op_name = getattr(func, "__name__", "call").strip("_").lower()
+        start = default_timer()
+
+        try:
+            with self.span("com." + op_name):
+                return self._run(func, *args, **kwargs)
+        except pythoncom.com_error:
+
+            _COM_ERRORS.inc(self.instance, op_name)
+
+            # Recover with the next operation if the process has failed.
+            if self.watchdog and not self.failure:
+
+                cause = self.check()
+
+                if cause:
+                    self.fail(cause)
+
+            raise
+
+        finally:
+            _OP_SECONDS.observe(
+                default_timer() - start, self.instance, op_name)
+
+    def check(self):
+        """Return the failure cause of the word process, None if healthy.
+
+        `self` is this session.
+        The check doesn't use COM, so it may run on any thread. The
+        method returns "crashed" if the process has exited, or "hung"
+        if its main window doesn't respond within the hang timeout.
+
+        """
+        try:
+            proc = win32api.OpenProcess(win32con.SYNCHRONIZE, False, self._pid)
+        except win32api.error:
+            return "crashed"
+
+        try:
+            if win32event.WaitForSingleObject(
+                    proc, 0) == win32event.WAIT_OBJECT_0:
+                return "crashed"
+
+        finally:
+            win32api.CloseHandle(proc)
+
+        if self._hwnd is None:
+
+            self._hwnd = self._find_window(self._pid)
+
+            # Hangs can't be detected without the main window.
+            if self._hwnd is None:
+                return None
+
+        try:
+            win32gui.SendMessageTimeout(
+                self._hwnd, win32con.WM_NULL, 0, 0, win32con.SMTO_NORMAL,
+                int(self.watchdog.hang_timeout * 1000))
+        except win32gui.error:
+            return "hung"
+
+    def close(self, *args, **kwargs):
+        """Stop monitoring and quit the word process.
+
+        `self` is this session.
+        Positional and keyword arguments are the same as those accepted
+        by the Quit method in word DOM API.
+
+        """
+        self._stop_monitor()
+
+        # A failed process has already exited or been killed.
+        if not self.failure:
+            self.app.Quit(*args, **kwargs)
+
+    def fail(self, cause):
+        """Mark the word process as failed.
+
+        `self` is this session.
+        `cause` is the failure cause.
+        A hung process is killed, so that pending operations fail. The
+        method isn't intended for direct use by clients.
+
+        """
+        if cause == "hung":
+            self._kill(self._pid)
+
+        self.failed_at = default_timer()
+        self.failure = cause
+
+    def get_rss(self):
+        """Return the resident memory size of the word process.
+
+        `self` is this session.
+
+        """
+        proc = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION |
+                                    win32con.PROCESS_VM_READ, False,
+                                    self._get_pid())
+
+        try:
+            return win32process.GetProcessMemoryInfo(proc)["WorkingSetSize"]
+        finally:
+            win32api.CloseHandle(proc)
+
+    def recycle(self):
+        """Quit the word process and start a new one.
+
+        `self` is this session.
+
+        """
+        with self.span("Session.recycle"):
+
+            self._stop_monitor()
+            self.app.Quit(constants.wdDoNotSaveChanges)
+            self._replace()
+
+    def restart(self):
+        """Replace the failed word process.
+
+        `self` is this session.
+
+        """
+        self._stop_monitor()
+
+        # A process failed by an error may still be running.
+        try:
+            self._kill(self._get_pid())
+        except (pythoncom.com_error, win32api.error):
+            pass
+
+        self.failure = None
+        self._replace()
+
+    def span(self, name, **attrs):
+        """Return a context timing an operation as a span.
+
+        `self` is this session.
+        `name` is the span name.
+        Keyword arguments are the span attributes.
+        The context does nothing and yields None unless spans are
+        enabled. The method isn't intended for direct use by clients.
+
+        """
+        return self.tracer.span(name, **attrs) if self.tracer else \
+            spans.NULL_SPAN
+
+    @staticmethod
+    def _expire(pid, expired):
+        """Kill the word process of an expired operation.
+
+        `pid` is the word process ID.
+        `expired` is the event to signal.
+
+        """
+        expired.set()
+        _Session._kill(pid)
+
+    @staticmethod
+    def _find_window(pid):
+        """Return the main window of the given word process, None if not
+        found.
+
+        `pid` is the word process ID.
+
+        """
+        windows = []
+        win32gui.EnumWindows(lambda hwnd, _: windows.append(hwnd), None)
+        return next((hwnd for hwnd in windows if win32gui.GetClassName(
+            hwnd) == "OpusApp" and win32process.GetWindowThreadProcessId(
+                hwnd)[1] == pid), None)
+
+    def _get_pid(self):
+        """Return the ID of the word process.
+
+        `self` is this session.
+        A process that couldn't be told apart from other word processes
+        started along with it is found by tagging the caption of its
+        main window, which has no documents yet.
+
+        """
+        if self._pid is None:
+
+            # Tag the word main window to find it.
+            caption = self.app.Caption
+            self.app.Caption = "officedom {} {}".format(
+                os.getpid(), id(self))
+
+            try:
+                self._hwnd = win32gui.FindWindow("OpusApp", self.app.Caption)
+                self._pid = win32process.GetWindowThreadProcessId(
+                    self._hwnd)[1]
+            finally:
+                self.app.Caption = caption
+
+        return self._pid
+
+    @staticmethod
+    def _get_word_pids():
+        """Return the set of IDs of the running word processes."""
+        pids = set()
+
+        for pid in win32process.EnumProcesses():
+
+            try:
+                proc = win32api.OpenProcess(
+                    win32con.PROCESS_QUERY_INFORMATION |
+                    win32con.PROCESS_VM_READ, False, pid)
+            except win32api.error:
+                continue  # system or protected process
+
+            try:
+                if os.path.basename(win32process.GetModuleFileNameEx(
+                        proc, None)).lower() == _WORD_EXE:
+                    pids.add(pid)
+
+            except win32api.error:
+                pass
+            finally:
+                win32api.CloseHandle(proc)
+
+        return pids
+
+    @staticmethod
+    def _kill(pid):
+        """Kill the given word process.
+
+        `pid` is the word process ID.
+
+        """
+        proc = win32api.OpenProcess(win32con.PROCESS_TERMINATE, False, pid)
+
+        try:
+            win32api.TerminateProcess(proc, 1)
+        finally:
+            win32api.CloseHandle(proc)
+
+    def _replace(self):
+        """Replace the word process with a new one.
 
-        `self` is this collection of languages.
-        `docs` are the COM objects representing languages.
+        `self` is this session.
 
         """
-        ReadOnlyList.__init__(self, langs, _Language)
+        self._start()
+        self.generation += 1
 
-    def Item(self, index):
-        """Return the language at the specified index.
+    def _run(self, func, *args, **kwargs):
+        """Run the given operation within the session timeout.
 
-        `self` is this collection of languages.
-        `index` is the language ID, name, or local name.
+        `self` is this session.
+        `func` is the operation to run.
+        Positional and keyword arguments are passed to the operation.
 
         """
-        return self.get_wrapper(self._raw_obj(index))
+        if self.timeout is None:
+            return func(*args, **kwargs)
 
-    def get_wrapper(self, raw_obj):
-        """Return the wrapper language for the given raw one.
+        expired = threading.Event()
+        timer = threading.Timer(
+            self.timeout, self._expire, [self._get_pid(), expired])
+        timer.start()
 
-        `self` is this collection of languages.
-        `raw_obj` is the raw language to get whose wrapper.
-        The method raises a ValueError if no language wraps the given
-        raw one.
+        try:
+            result = func(*args, **kwargs)
+        except pythoncom.com_error:
+            # A killed process fails the pending call.
+            self._stop_timer(timer)
 
-        """
-        # Check if the language is wrapped.
-        for cur_lang in self._wrapper_list:
-            # Comparison is based on ID's.
-            if cur_lang.raw_obj.ID == raw_obj.ID:
-                return cur_lang
+            if not expired.is_set():
+                raise
 
-        raise ValueError()
+        else:
 
+            self._stop_timer(timer)
 
-class _LightDocument(LightObject, object):
+            if not expired.is_set():
+                return result
 
-    """Lightweight word document
+        _TIMEOUTS.inc(self.instance)
 
-    This document class is stateless; it doesn't hold a reference to the
-    underlying document COM object.
+        # Restore tracked documents with the next operation.
+        if self.watchdog:
+            self.fail("timeout")
+        else:
+            self._replace()
 
-    """
+        raise CallTimeoutError(
+            "word operation exceeded {} seconds".format(self.timeout))
 
-    def __init__(self, doc):
-        """Create a lightweight word document.
+    def _start(self):
+        """Start a new word process.
 
-        `self` is this word document.
-        `doc` is the underlying COM object representing the document.
+        `self` is this session.
 
         """
-        self._active_theme = doc.ActiveTheme
-        self._tmpl = doc.AttachedTemplate.FullName
-        self.active_writing_style = {}
-
-        for lang in doc.Application.Languages:
-            try:  # sorry, no clean way to know available languages
-                entry_maker = partial(
-                    self._style_entry, lang, doc.ActiveWritingStyle(lang.ID))
-            except pythoncom.com_error:
-                pass
-            else:
-                self.active_writing_style.update(
-                    itertools.imap(entry_maker, ["ID", "Name", "NameLocal"]))
+        with _start_lock:
 
-    def sync(self, doc):
-        """Update the underlying COM object.
+            old_pids = self._get_word_pids()
+            self.app = win32com.client.DispatchEx("Word.Application")
+            new_pids = self._get_word_pids() - old_pids
 
-        `self` is this word document.
-        `doc` is the underlying COM object to update.
-        The method isn't intended for direct use by clients.
+        if self._recorder:
+            self.app = self._recorder.wrap(self.app)
 
-        """
-        if self.active_theme == NO_OBJ:
-            doc.RemoveTheme()
-        else:
-            doc.ApplyTheme(self._active_theme)
+        # documents opened or added in this process
+        self.doc_count = 0
+        self._pid = None
+        self._hwnd = None
 
-        # The active writing style property can't be updated.
-        doc.AttachedTemplate = self._tmpl
+        if len(new_pids) == 1:
 
-    @property
-    def active_theme(self):
-        """Active theme
+            self._pid = new_pids.pop()
+            self._hwnd = self._find_window(self._pid)
 
-        `self` is this word document.
+        if self.watchdog:
 
-        """
-        return self._active_theme.lower()  # lower case
+            self._get_pid()
+            self._monitor = _Monitor(self, self.watchdog.interval)
+            self._monitor.start()
 
-    @active_theme.setter
-    def active_theme(self, value):
-        """Set the active theme for this document.
+    def _stop_monitor(self):
+        """Stop monitoring the word process.
 
-        `self` is this word document.
-        `value` is the desired active theme.
+        `self` is this session.
 
         """
-        self._active_theme = value
+        if self._monitor:
 
-    @property
-    def attached_template(self):
-        """Reference template full name
+            self._monitor.stop()
+            self._monitor = None
 
-        `self` is this word document.
+    @staticmethod
+    def _stop_timer(timer):
+        """Stop the given timer, waiting for it if already running.
+
+        `timer` is the timer to stop.
 
         """
-        return self._tmpl.lower()  # lower case
+        timer.cancel()
+        timer.join()
 
-    @attached_template.setter
-    def attached_template(self, value):
-        """Set the reference template for this document.
 
-        `self` is this word document.
-        `value` is the desired template itself or its full name.
+class _SnapshotLoader(object):
 
-        """
-        self._tmpl = str(value)
+    """Pool of threads taking template snapshots concurrently
 
-    @staticmethod
-    def _style_entry(lang, style, attr):
-        """Return a writing style tuple.
+    Word objects may only be used from the apartment that created them,
+    so template interfaces are marshalled to the worker threads, each
+    running in its own apartment. The threads exit once all queued
+    snapshots are taken after closing the loader.
+
+    """
+
+    def __init__(self, workers):
+        """Create a snapshot loader.
 
-        `lang` is the language to work on.
-        `style` is the active writing style of the language.
-        `attr` is the key language attribute.
-        The method creates and returns a tuple of the specified language
-        attribute and its active writing style.
+        `self` is this snapshot loader.
+        `workers` is the number of worker threads.
 
         """
-        attr_val = getattr(lang, attr)
-        return attr_val.__class__(str(attr_val).lower()), style.lower()
+        self._queue = Queue.Queue()
+        self._workers = workers
 
+        for _ in xrange(workers):
 
-class _LightTemplate(LightObject):
+            worker = threading.Thread(
+                target=self._run, name="officedom template loader")
+            worker.daemon = True
+            worker.start()
 
-    """Lightweight word template
+    def add(self, tmpl, raw_tmpl):
+        """Queue taking a snapshot of the given template.
 
-    This template class is stateless; it doesn't hold a reference to the
-    underlying template COM object.
+        `self` is this snapshot loader.
+        `tmpl` is the template to set the snapshot of.
+        `raw_tmpl` is the underlying COM object representing the
+                   template.
 
-    """
+        """
+        self._queue.put((tmpl, pythoncom.CoMarshalInterThreadInterfaceInStream(
+            pythoncom.IID_IDispatch, raw_tmpl._oleobj_)))
 
-    def __init__(self, tmpl):
-        """Create a lightweight word template.
+    def close(self):
+        """Let the worker threads exit after the queued snapshots.
 
-        `self` is this word template.
-        `tmpl` is the underlying COM object representing the template.
+        `self` is this snapshot loader.
 
         """
-        self.auto_text_entries = dict(
-            (entry.Name, entry.Value) for entry in tmpl.AutoTextEntries)
+        for _ in xrange(self._workers):
+            self._queue.put(None)
 
-    def sync(self, tmpl):
-        """Update the underlying COM object.
+    def _run(self):
+        """Take snapshots of queued templates until closed.
 
-        `self` is this word template.
-        `tmpl` is the underlying COM object to update.
+        `self` is this snapshot loader.
 
         """
-        # Rewrite the autoText entries of the raw template.
-        for entry in tmpl.AutoTextEntries:
-            entry.Delete()
+        pythoncom.CoInitialize()
 
-        entries = self.auto_text_entries.iteritems()
+        try:
+            for tmpl, stream in iter(self._queue.get, None):
 
-        for name, val in entries:
-            tmpl.AutoTextEntries.Add(
-                name, tmpl.Application.Selection.Range).Value = val
+                try:
+                    data = _LightTemplate(win32com.client.Dispatch(
+                        pythoncom.CoGetInterfaceAndReleaseStream(
+                            stream, pythoncom.IID_IDispatch)))
+                # The snapshot is taken upon first use instead.
+                except Exception:
+                    data = None
+
+                tmpl.set_data(data)
+
+        finally:
+            pythoncom.CoUninitialize()
 
 
 class _Template(WrapperObject):
@@ -601,23 +2842,38 @@ class _Template(WrapperObject):
     """Word template
 
     This template class is stateful in the sense that it holds a
-    permanent reference(throughout its lifetime) to the underlying
-    template COM object.
+    permanent reference(until released) to the underlying template COM
+    object.
 
     """
 
-    def __init__(self, docs, tmpl):
+    def __init__(self, docs, tmpl, loader=None):
         """Create a word template.
 
         `self` is this word template.
         `docs` are the collection of open documents. This list is
                notified upon opening this template as a document.
         `tmpl` is the underlying COM object representing the template.
+        `loader` is the loader to take the template snapshot
+                 concurrently, None to take it right away.
 
         """
         WrapperObject.__init__(self, tmpl)
-        self.data = _LightTemplate(tmpl)
-        self._docs = docs
+        self._docs = proxy(docs)
+        self._data = None
+        # event set once a concurrently taken snapshot arrives
+        self._data_ready = None
+
+        if loader:
+            try:
+                loader.add(self, tmpl)
+            except (AttributeError, pythoncom.com_error):
+                pass  # The snapshot is taken upon first use.
+            else:
+                self._data_ready = threading.Event()
+
+        else:
+            self._data = docs.session.call(_LightTemplate, tmpl)
 
     def __str__(self):
         """Return the full name of this template
@@ -627,13 +2883,29 @@ class _Template(WrapperObject):
         """
         return self._raw_obj.FullName
 
+    def apply_delta(self, delta):
+        """Apply the given changes to this template.
+
+        `self` is this word template.
+        `delta` is the changes to apply, as returned by diffing two
+                template snapshots.
+        The method updates the snapshot of this template and
+        synchronizes it to the underlying COM object without saving.
+
+        """
+        with self._docs.session.span("Template.apply_delta"):
+
+            self.data.apply_delta(delta, self._raw_obj)
+            self._docs.tmpls.reindex(self)
+
     def open_as_document(self):
         """Open this template as a document.
 
         `self` is this word template.
 
         """
-        return self._docs.add_raw_doc(self._raw_obj.OpenAsDocument())
+        with self._docs.session.span("Template.open_as_document"):
+            return self._docs.add_raw_doc(self._raw_obj.OpenAsDocument())
 
     def save(self):
         """Save this template.
@@ -643,8 +2915,46 @@ class _Template(WrapperObject):
         to be saved.
 
         """
-        self.data.sync(self._raw_obj)
-        self._raw_obj.Save()
+        with self._docs.session.span("Template.save"):
+
+            self.data.sync(self._raw_obj)
+            self._raw_obj.Save()
+            self._docs.tmpls.reindex(self)
+
+    def set_data(self, data):
+        """Set the snapshot taken concurrently for this template.
+
+        `self` is this word template.
+        `data` is the template snapshot, None if taking it failed.
+        A snapshot arriving after one was taken on the calling thread is
+        dropped. The method isn't intended for direct use by clients.
+
+        """
+        if self._data is None:
+            self._data = data
+
+        self._data_ready.set()
+
+    @property
+    def data(self):
+        """Template snapshot
+
+        `self` is this word template.
+        A snapshot still being taken concurrently is waited for as long
+        as the call timeout; one that failed or timed out is taken on the
+        calling thread.
+
+        """
+        if self._data is None:
+
+            if self._data_ready:
+                self._data_ready.wait(self._docs.session.timeout)
+
+            if self._data is None:
+                self._data = self._docs.session.call(
+                    _LightTemplate, self._raw_obj)
+
+        return self._data
 
     @property
     def full_name(self):
@@ -669,15 +2979,38 @@ class _Templates(ReadOnlyList):
 
     """Collection of templates"""
 
-    def __init__(self, tmpls, docs):
+    def __init__(self, tmpls, docs, workers=None):
         """Create a collection of templates.
 
         `self` is this collection of templates.
         `tmpls` are the COM objects representing templates.
         `docs` are the collection of open documents.
+        `workers` is the number of threads taking snapshots of the given
+                  templates concurrently, None to take them right away.
+        Concurrently loaded templates are indexed for autoText look-ups
+        upon the first look-up.
 
         """
-        ReadOnlyList.__init__(self, tmpls, partial(_Template, docs))
+        loader = _SnapshotLoader(workers) if workers else None
+        ReadOnlyList.__init__(
+            self, tmpls, partial(_Template, docs, loader=loader))
+        self._session = docs.session
+        self._auto_text = _AutoTextIndex()
+        # (template, full name) tuples by lower case assigned path
+        self._paths = {}
+
+        if loader:
+
+            loader.close()
+            # templates whose autoText entries aren't indexed yet
+            self._unindexed = list(self._wrapper_list)
+
+        else:
+
+            self._unindexed = []
+
+            for tmpl in self._wrapper_list:
+                self._auto_text.add(tmpl)
 
     def add(self, tmpl):
         """Add the template.
@@ -688,6 +3021,7 @@ class _Templates(ReadOnlyList):
 
         """
         self._wrapper_list.append(tmpl)
+        self._auto_text.add(tmpl)
 
     def cleanup(self):
         """Remove unloaded templates.
@@ -697,14 +3031,300 @@ class _Templates(ReadOnlyList):
         the open documents. It isn't intended for direct use by clients.
 
         """
+        _TMPL_CLEANUPS.inc(self._session.instance)
+        raw_tmpls = self.raw_templates()
         count = 0
         num_of_tmpls = len(self._wrapper_list)
 
         while count < num_of_tmpls:
             # template still referenced
-            if self._wrapper_list[count].raw_obj in self._raw_obj:
+            if self._wrapper_list[count].raw_obj in raw_tmpls:
                 count += 1
             else:  # template no longer referenced
 
-                self._wrapper_list.remove(self._wrapper_list[count])
+                tmpl = self._wrapper_list.pop(count)
+
+                if tmpl in self._unindexed:
+                    self._unindexed.remove(tmpl)
+                else:
+                    self._auto_text.remove(tmpl)
+
+                self._forget(tmpl)
+                tmpl.release()
                 num_of_tmpls -= 1
+
+    def find_auto_text(self, name, prefix=False, ignore_case=False):
+        """Return the autoText entries matching the given name.
+
+        `self` is this collection of templates.
+        `name` is the entry name(or name prefix) to look up.
+        `prefix` is True to match entries whose names start with the
+                 given name, False to match the given name exactly.
+        `ignore_case` is True for case-insensitive matching.
+        The method returns a list of (template, entry name) tuples
+        ordered by entry name, covering the entries of all loaded
+        templates as of their last load or save.
+
+        """
+        with self._session.span("Templates.find_auto_text", entry=name):
+
+            for tmpl in self._unindexed:
+                self._auto_text.add(tmpl)
+
+            self._unindexed = []
+            return self._auto_text.find(name, prefix, ignore_case)
+
+    def raw_templates(self):
+        """Return a list of the raw templates currently loaded by word.
+
+        `self` is this collection of templates.
+        The method isn't intended for direct use by clients.
+
+        """
+        return list(self._raw_obj)
+
+    def reindex(self, tmpl):
+        """Update the autoText index for the given template.
+
+        `self` is this collection of templates.
+        `tmpl` is the template whose autoText entries have changed.
+        The method isn't intended for direct use by clients.
+
+        """
+        self._auto_text.update(tmpl)
+
+    def release(self):
+        """Release the raw collection and all wrapped templates.
+
+        `self` is this collection of templates.
+
+        """
+        self._auto_text = _AutoTextIndex()
+        self._unindexed = []
+        self._paths.clear()
+        ReadOnlyList.release(self)
+
+    def remember(self, path, raw_tmpl, full_name):
+        """Cache the template assigned by the given path.
+
+        `self` is this collection of templates.
+        `path` is the template name or path assigned.
+        `raw_tmpl` is the raw template word resolved the path to.
+        `full_name` is the template full name.
+        Templates that aren't loaded yet, like with deferred template
+        refreshes, aren't cached. The method isn't intended for direct
+        use by clients.
+
+        """
+        try:
+            tmpl = self.get_wrapper(raw_tmpl)
+        except ValueError:
+            return
+
+        for cur_path in [path, full_name]:
+            self._paths[cur_path.lower()] = tmpl, full_name
+
+    def resolve(self, path):
+        """Return the loaded template assigned by the given path.
+
+        `self` is this collection of templates.
+        `path` is the template name or path.
+        The method returns a (template, full name) tuple, None if the
+        path wasn't cached. The method isn't intended for direct use by
+        clients.
+
+        """
+        return self._paths.get(path.lower())
+
+    def _forget(self, tmpl):
+        """Drop the cached paths of the given template.
+
+        `self` is this collection of templates.
+        `tmpl` is the template to drop the paths of.
+
+        """
+        for path in [path for path, entry in self._paths.iteritems() if
+                     entry[0] is tmpl]:
+            del self._paths[path]
+
+
+class _ThemeCatalog(object):
+
+    """Catalog of the themes available to word
+
+    The catalog lists the theme folders of the installed office version
+    once upon first use, so theme names are validated and resolved
+    without COM calls. If the themes folder can't be found, the catalog
+    is empty and accepts any theme.
+
+    """
+
+    def __init__(self, session):
+        """Create a theme catalog.
+
+        `self` is this theme catalog.
+        `session` is the word session to read the office version from.
+
+        """
+        self._session = session
+        # theme names by their lower case form, None until loaded
+        self._names = None
+
+    def __contains__(self, name):
+        """Test if the given theme is available.
+
+        `self` is this theme catalog.
+        `name` is the theme name, in any case.
+
+        """
+        return name.lower() in self._get_names()
+
+    def __iter__(self):
+        """Iterate over the available theme names in lower case.
+
+        `self` is this theme catalog.
+
+        """
+        return iter(sorted(self._get_names()))
+
+    def __len__(self):
+        """Return the number of available themes.
+
+        `self` is this theme catalog.
+
+        """
+        return len(self._get_names())
+
+    def refresh(self):
+        """Reload the available themes.
+
+        `self` is this theme catalog.
+
+        """
+        themes_dir = os.path.join(win32api.ExpandEnvironmentStrings(
+            "%CommonProgramFiles%"), _THEMES_DIR.format(
+                self._session.app.Version.partition(".")[0]))
+        self._names = {}
+
+        if os.path.isdir(themes_dir):
+            for name in os.listdir(themes_dir):
+                if os.path.isdir(os.path.join(themes_dir, name)):
+                    self._names[name.lower()] = name
+
+    @staticmethod
+    def resolve(names, name):
+        """Return the catalog form of the given theme name.
+
+        `names` are the catalog names of the available themes by their
+                lower case form, None or empty to accept any theme.
+        `name` is the theme name, in any case, optionally followed by
+               the theme formatting flags.
+        The method raises a ValueError if the theme isn't available.
+
+        """
+        theme, sep, flags = name.partition(" ")
+        folded = theme.lower()
+
+        if not names or folded == NO_OBJ:
+            return name
+
+        if folded not in names:
+            raise ValueError("unknown theme: {}".format(folded))
+
+        return names[folded] + sep + flags
+
+    @property
+    def names(self):
+        """Catalog names of the available themes by their lower case form
+
+        `self` is this theme catalog.
+        The names are a plain dictionary, replaced rather than changed
+        upon refreshing, so holding them doesn't keep the word session
+        alive.
+
+        """
+        return self._get_names()
+
+    def _get_names(self):
+        """Return the available theme names by their lower case form.
+
+        `self` is this theme catalog.
+
+        """
+        if self._names is None:
+            self.refresh()
+
+        return self._names
+
+
+class _WritingStyles(collections.Mapping):
+
+    """Read-only mapping of languages to writing styles
+
+    The mapping holds one style code per language slot of a shared
+    language table.
+
+    """
+
+    def __init__(self, lang_table, codes):
+        """Create a writing style mapping.
+
+        `self` is this writing style mapping.
+        `lang_table` is the shared language table.
+        `codes` is the array of style codes by language slot.
+
+        """
+        self._table = lang_table
+        self._codes = codes
+
+    def __getitem__(self, key):
+        """Return the writing style of the given language.
+
+        `self` is this writing style mapping.
+        `key` is the lower case language ID, name, or local name.
+
+        """
+        # Later languages take precedence upon key clashes.
+        for slot in reversed(self._table.get_slots(key)):
+            if self._codes[slot]:
+                return self._table.get_style(self._codes[slot])
+
+        raise KeyError(key)
+
+    def __iter__(self):
+        """Iterate over the keys of languages having writing styles.
+
+        `self` is this writing style mapping.
+
+        """
+        return (key for key in self._table.keys if key in self)
+
+    def __len__(self):
+        """Return the number of keys having writing styles.
+
+        `self` is this writing style mapping.
+
+        """
+        return sum(1 for _ in self)
+
+    def replace(self, styles):
+        """Return a new mapping with the given writing styles.
+
+        `self` is this writing style mapping.
+        `styles` is the mapping of languages to writing styles.
+        The method raises a KeyError if a language isn't in the language
+        table.
+
+        """
+        codes = array(_STYLE_CODE_TYPE, [0]) * len(self._codes)
+
+        for key, style in styles.iteritems():
+
+            slots = self._table.get_slots(key)
+
+            if not slots:
+                raise KeyError(key)
+
+            codes[slots[-1]] = self._table.style_code(style)
+
+        return _WritingStyles(self._table, codes)
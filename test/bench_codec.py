@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""benchmarks lightweight object serialization"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         bench_codec.py
+#
+# function:     serialization benchmark
+#
+# description:  compares encoding/decoding time and size of the
+#               lightweight object codecs against pyxser
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import cPickle
+from functools import partial
+from os.path import abspath, join
+import sys
+from timeit import repeat
+
+import pyxser
+
+from officedom import codec
+from officedom.word import Application
+
+def main():
+    """entry point for running the benchmark
+
+    The optional command line argument is the number of autoText entries
+    to pad the template snapshot with.
+
+    """
+    num_of_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    encoding = "utf-8"
+    with Application() as app:
+
+        with app.documents.open(abspath(join("data", "test.doc"))) as doc:
+            snapshots = [("document", doc.data)]
+
+        tmpl_data = app.normal_template.data
+        tmpl_data.auto_text_entries.update(
+            ("entry {}".format(entry), "value {}".format(entry)) for entry in
+            xrange(num_of_entries))
+        snapshots.append(("template", tmpl_data))
+
+    codecs = [
+        ("pyxser", partial(pyxser.serialize, enc=encoding),
+         lambda data: pyxser.unserialize(obj=data, enc=encoding)),
+        ("binary", codec.dumps, codec.loads),
+        ("json", codec.to_json, codec.from_json),
+        ("pickle", partial(cPickle.dumps, protocol=2), cPickle.loads)]
+    print "{:10}{:8}{:>12}{:>12}{:>12}".format(
+        "snapshot", "codec", "size", "encode ms", "decode ms")
+
+    for snapshot_name, snapshot in snapshots:
+        for codec_name, encoder, decoder in codecs:
+
+            data = encoder(snapshot)
+            print "{:10}{:8}{:>12}{:>12.3f}{:>12.3f}".format(
+                snapshot_name, codec_name, len(data),
+                _best_time(partial(encoder, snapshot)),
+                _best_time(partial(decoder, data)))
+
+def _best_time(func):
+    """Return the best running time of the given function in ms.
+
+    `func` is the function to time.
+
+    """
+    return min(repeat(func, number=1, repeat=5)) * 1000
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""tests snapshot codecs"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         test_codec.py
+#
+# function:     snapshot codec tests
+#
+# description:  tests encoding and decoding lightweight objects
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+import unittest
+from unittest import TestCase
+
+from officedom import codec
+
+class JsonTest(TestCase):
+
+    """Test case for encoding objects in JSON"""
+
+    def test_tuple_keys(self):
+        """Test encoding dictionaries with tuple keys.
+
+        `self` is this test case.
+        Encode an object holding a dictionary keyed by nested tuples in
+        JSON, and then decode it.
+        Verify that the dictionary is restored with tuple keys.
+
+        """
+        obj = _Snapshot()
+        obj.entries = {(1, ("a", 2)): "x", (3,): "y"}
+        self.assertEqual(codec.from_json(codec.to_json(obj)).__dict__,
+                         obj.__dict__)
+
+
+@codec.register("test.snapshot")
+class _Snapshot(object):
+
+    """Lightweight object free of COM"""
+
+    def __getstate__(self):
+        """Return the state of this object for serialization.
+
+        `self` is this object.
+
+        """
+        return 1, self.__dict__
+
+    def __setstate__(self, state):
+        """Restore this object from the given state.
+
+        `self` is this object.
+        `state` is the state previously returned by __getstate__.
+
+        """
+        self.__dict__.update(state[1])
+
+def main():
+    """entry point for running test in this module"""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
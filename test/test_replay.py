@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""tests replaying COM call traces offline"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         test_replay.py
+#
+# function:     offline trace replay tests
+#
+# description:  tests replaying COM call traces without word
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+from io import BytesIO
+import unittest
+from unittest import TestCase
+
+from officedom.trace import read, Recorder, Replayer
+
+class ReplayTest(TestCase):
+
+    """Test case for replaying traces without word"""
+
+    def test_replay(self):
+        """Test replaying a trace of simulated COM objects.
+
+        `self` is this test case.
+        Record calls made on plain objects standing for COM objects.
+        Replay the trace and verify that every recorded call and object
+        is reproduced.
+
+        """
+        trace = BytesIO()
+        with Recorder(trace) as recorder:
+
+            docs = recorder.wrap(_RawObject())
+            self.assertEqual(docs.Name, "object 0")
+            self.assertEqual(docs.Item(1).Name, "object 1")
+            self.assertEqual(len(list(docs)), 2)
+
+        trace.seek(0)
+        num_of_calls = len(list(read(trace)))
+        trace.seek(0)
+        replayer = Replayer()
+        stats = replayer.replay(trace)
+        self.assertEqual(stats["Name"].calls, 2)
+        self.assertEqual(stats["Item"].calls, 1)
+        self.assertEqual(sum(
+            member_stats.calls for member_stats in stats.itervalues()),
+                         num_of_calls)
+        # the collection, the item fetched and the two iterated items
+        self.assertEqual(len(replayer.objects), 4)
+
+
+class _RawObject(object):
+
+    """Plain object standing for a COM object"""
+
+    # COM objects are recognized by having this attribute.
+    _oleobj_ = None
+
+    def __init__(self, number=0):
+        """Create a raw object.
+
+        `self` is this raw object.
+        `number` is the object number reported by its name.
+
+        """
+        self.Name = "object {}".format(number)
+
+    def __iter__(self):
+        """Iterate over two items of this object.
+
+        `self` is this raw object.
+
+        """
+        return iter([_RawObject(2), _RawObject(3)])
+
+    def Item(self, number):
+        """Return the given item of this object.
+
+        `self` is this raw object.
+        `number` is the item number.
+
+        """
+        return _RawObject(number)
+
+def main():
+    """entry point for running test in this module"""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""tests scanning document trees"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         test_scan.py
+#
+# function:     document tree scanner tests
+#
+# description:  tests scanning directory trees for document metadata
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+from io import BytesIO
+import json
+from os.path import abspath, join
+import shutil
+import tempfile
+import unittest
+from unittest import TestCase
+
+from officedom.scan import Scanner
+
+class ScanTest(TestCase):
+
+    """Test case for scanning document trees"""
+
+    def test_resume(self):
+        """Test resuming a scan from a checkpoint.
+
+        `self` is this test case.
+        Scan the test data directory with a checkpoint.
+        Verify that every document was scanned and that the loaded
+        public fields of its snapshot were written.
+        Scan the directory again from the same checkpoint.
+        Verify that all documents were skipped.
+
+        """
+        data_dir = abspath("data")
+        work_dir = tempfile.mkdtemp()
+
+        try:
+
+            checkpoint = join(work_dir, "checkpoint")
+            out_stream = BytesIO()
+            scanner = Scanner(out_stream, 2, checkpoint)
+            scanner.scan(data_dir)
+            scanner.close()
+            records = [json.loads(line) for line in
+                       out_stream.getvalue().splitlines()]
+            self.assertEqual(sorted(record["path"] for record in records),
+                             [join(data_dir, doc) for doc in
+                              ["a.doc", "test.doc", "test.dot"]])
+            fields = [
+                "active_theme", "active_writing_style", "attached_template"]
+            self.assertTrue(all(sorted(record["data"]) == fields for record
+                                in records))
+            self.assertLessEqual(
+                scanner.percentile(50), scanner.percentile(99))
+            out_stream = BytesIO()
+            scanner = Scanner(out_stream, 2, checkpoint)
+            scanner.scan(data_dir)
+            scanner.close()
+            self.assertFalse(out_stream.getvalue())
+            self.assertEqual(scanner.skipped, len(records))
+
+        finally:
+            shutil.rmtree(work_dir, True)
+
+def main():
+    """entry point for running test in this module"""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
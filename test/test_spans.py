@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""tests operation spans"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         test_spans.py
+#
+# function:     operation span tests
+#
+# description:  tests emitting operation spans to sinks
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+from io import BytesIO
+import json
+import unittest
+from unittest import TestCase
+
+from officedom.spans import ChromeTraceSink, Tracer
+
+class SpanTest(TestCase):
+
+    """Test case for emitting spans"""
+
+    def test_byte_attrs(self):
+        """Test emitting spans with non-ASCII byte string attributes.
+
+        `self` is this test case.
+        Emit a span having a file name attribute in a legacy encoding to
+        a chrome trace sink.
+        Verify that the span is written with the invalid bytes replaced.
+
+        """
+        stream = BytesIO()
+        with ChromeTraceSink(stream) as sink:
+            with Tracer(sink).span("open", file_name="r\xe9sum\xe9.doc"):
+                pass
+
+        self.assertEqual(json.loads(stream.getvalue())[0]["args"],
+                         {"file_name": u"r\ufffdsum\ufffd.doc"})
+
+    def test_sink_failure(self):
+        """Test failing to emit spans.
+
+        `self` is this test case.
+        Trace an operation with a sink failing to emit spans.
+        Verify that the operation succeeds and the span is dropped.
+
+        """
+        tracer = Tracer(_FailingSink())
+        with tracer.span("save"):
+            pass
+
+        self.assertEqual(tracer.dropped, 1)
+
+
+class _FailingSink(object):
+
+    """Sink failing to emit spans"""
+
+    def emit(self, span):
+        """Fail to emit the given span.
+
+        `self` is this sink.
+        `span` is the finished span.
+
+        """
+        raise IOError("disk full")
+
+def main():
+    """entry point for running test in this module"""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""tests COM call tracing"""
+
+############################################################
+#
+# Copyright 2026 Mohammed El-Afifi
+# This file is part of pyofficedom.
+#
+# pyofficedom is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Lesser General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# pyofficedom is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with pyofficedom.  If not, see
+# <http://www.gnu.org/licenses/>.
+#
+# program:      python office DOM
+#
+# file:         test_trace.py
+#
+# function:     COM call tracing tests
+#
+# description:  tests recording and replaying COM call traces
+#
+# author:       Mohammed El-Afifi (ME)
+#
+# environment:  KWrite 5.0.0, python 2.7.10, Fedora release 22
+#               (Twenty Two)
+#
+# notes:        This is a private program.
+#
+############################################################
+
+from io import BytesIO
+from os.path import abspath, join
+import unittest
+from unittest import TestCase
+
+from officedom.trace import read, Recorder, Replayer, summarize
+from officedom.word import Application
+
+class TraceTest(TestCase):
+
+    """Test case for recording and replaying traces"""
+
+    def test_replay(self):
+        """Test replaying a recorded trace.
+
+        `self` is this test case.
+        Record the COM calls of opening and closing a document.
+        Replay the trace and verify that all recorded calls are replayed.
+
+        """
+        test_doc = abspath(join("data", "test.doc"))
+        trace = BytesIO()
+        with Recorder(trace) as recorder:
+            with Application(recorder=recorder) as app:
+                with app.documents.open(test_doc):
+                    pass
+
+        trace.seek(0)
+        num_of_calls = len(list(read(trace)))
+        trace.seek(0)
+        stats = Replayer().replay(trace)
+        self.assertEqual(stats["Open"].calls, 1)
+        self.assertEqual(sum(
+            member_stats.calls for member_stats in stats.itervalues()),
+                         num_of_calls)
+        trace.seek(0)
+        self.assertEqual(
+            dict((member, member_stats.calls) for member, member_stats in
+                 summarize(trace).iteritems()),
+            dict((member, member_stats.calls) for member, member_stats in
+                 stats.iteritems()))
+
+def main():
+    """entry point for running test in this module"""
+    unittest.main()
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@
 
 ############################################################
 #
-# Copyright 2012, 2014, 2017 Mohammed El-Afifi
+# Copyright 2012, 2014, 2017, 2026 Mohammed El-Afifi
 # This file is part of pyofficedom.
 #
 # pyofficedom is free software: you can redistribute it and/or modify
@@ -39,20 +39,31 @@
 #
 ############################################################
 
+import cPickle
 from functools import partial
+import json
 import os
 from os.path import abspath, join
+import re
 import shutil
 from shutil import rmtree
+import time
 import unittest
 from unittest import TestCase
 import xml.etree.ElementTree
 
 from mock import MagicMock
+import pythoncom
 import pyxser
 
 import Fixture
-from officedom.word import Application, constants, NO_OBJ
+from officedom import codec, metrics
+from officedom.cache import ConversionCache
+from officedom.export import Exporter, PATH_COL, Table, THEME_COL, TMPL_COL
+from officedom.spans import ChromeTraceSink, Tracer
+from officedom.utils import BusyMessageFilter, MapDelta
+from officedom.word import Application, CallTimeoutError, constants, \
+    NO_OBJ, RecyclePolicy, WatchdogPolicy, WriteBehindPolicy
 
 class AppContextTest(TestCase):
 
@@ -104,6 +115,58 @@ class DocChangeTest(TestCase):
         """
         self._fixture.tearDown()
 
+    def test_delta(self):
+        """Test applying snapshot deltas.
+
+        `self` is this test case.
+        Load a document and diff its snapshot against a modified copy.
+        Apply the delta to the document, and then save the document.
+        Close the document.
+        Open the document again and verify that it matches the modified
+        copy.
+
+        """
+        test_doc = "test.doc"
+        out_file = join(self._fixture.out_dir, test_doc)
+        with Application() as app:
+
+            doc = app.documents.open(join(self._fixture.data_dir, test_doc))
+            new_data = codec.loads(codec.dumps(doc.data))
+            new_data.active_theme = NO_OBJ
+            delta = doc.data.diff(new_data)
+            self.assertEqual(delta, {"active_theme": NO_OBJ})
+            doc.apply_delta(delta)
+            self.assertEqual(doc.data, new_data)
+            doc.save_as(out_file)
+            doc.close()
+            # Reopen and validate the document.
+            with app.documents.open(out_file) as doc:
+                self.assertEqual(doc.data, new_data)
+
+    def test_style_delta(self):
+        """Test diffing writing style changes.
+
+        `self` is this test case.
+        Load a document and change the writing style of a language in a
+        copy of its snapshot.
+        Verify that the delta holds only the changed writing style and
+        can be pickled.
+
+        """
+        new_style = "grammar & style"
+        with Application() as app:
+            with app.documents.open(
+                join(self._fixture.data_dir, "test.doc")) as doc:
+
+                new_data = codec.loads(codec.dumps(doc.data))
+                styles = dict(doc.data.active_writing_style)
+                styles[constants.wdEnglishUS] = new_style
+                new_data.active_writing_style = styles
+                delta = doc.data.diff(new_data)
+                self.assertEqual(delta, {"active_writing_style": MapDelta(
+                    {constants.wdEnglishUS: new_style}, [])})
+                self.assertEqual(cPickle.loads(cPickle.dumps(delta)), delta)
+
     def test_theme(self):
         """Test changing themes.
 
@@ -168,6 +231,48 @@ class DocChangeTest(TestCase):
             with app.documents.open(out_file) as doc:
                 self.assertEqual(doc.data, doc_data)
 
+    def test_tmpl_retarget(self):
+        """Test retargeting documents to the same template.
+
+        `self` is this test case.
+        Attach two documents to the same template by different name
+        cases.
+        Verify that both documents reference the same loaded template.
+        While deferring template refreshes, attach both documents to the
+        normal template and back.
+        Verify that the attached template is still loaded.
+        Revert both documents to the normal template.
+        Verify that the template was unloaded.
+
+        """
+        new_tmpl = "Elegant Letter.dot"
+        with Application() as app:
+
+            docs = [app.documents.open(
+                join(self._fixture.data_dir, "test.doc")),
+                    app.documents.add()]
+
+            for doc, tmpl_name in zip(docs, [new_tmpl, new_tmpl.lower()]):
+                doc.attached_template = tmpl_name
+
+            self.assertEqual(docs[0].attached_template,
+                             docs[1].attached_template)
+            self.assertEqual(len(app.templates), 2)
+            with app.documents.deferred_template_refresh():
+                for tmpl_name in [app.normal_template, new_tmpl]:
+                    for doc in docs:
+                        doc.attached_template = tmpl_name
+
+            self.assertEqual(len(app.templates), 2)
+            self.assertEqual(
+                app.templates[docs[0].attached_template].full_name,
+                docs[0].attached_template)
+
+            for doc in docs:
+                doc.attached_template = app.normal_template
+
+            self.assertEqual(len(app.templates), 1)
+
 
 class DocTest(TestCase):
 
@@ -217,6 +322,60 @@ class DocTest(TestCase):
                 self.assertIsNone(xml.etree.ElementTree.fromstring(
                     pyxser.serialize(doc.data, encoding)).find(objref_path))
 
+    def test_add_many(self):
+        """Test adding many documents based on the same template.
+
+        `self` is this test case.
+        Add documents kept open and documents saved to files.
+        Verify that open documents are tracked and saved ones are
+        written and closed. Verify that too few paths are rejected and
+        that documents failing to save are closed.
+
+        """
+        tmpl = join(self._fixture.data_dir, "test.dot")
+        out_files = [join(self._fixture.out_dir, "doc{}.doc".format(idx))
+                     for idx in xrange(2)]
+        with Application() as app:
+
+            docs = app.documents
+            self.assertEqual(len(list(docs.add_many(tmpl, 2))), 2)
+            self.assertEqual(len(docs), 2)
+            self.assertEqual(
+                list(docs.add_many(tmpl, 2, out_files)), out_files)
+            self.assertEqual(len(docs), 2)
+
+            for cur_file in out_files:
+                self.assertTrue(os.path.isfile(cur_file))
+
+            self.assertRaises(
+                ValueError, list, docs.add_many(tmpl, 3, out_files))
+            self.assertRaises(pythoncom.com_error, list, docs.add_many(
+                tmpl, 1, [join(self._fixture.out_dir, "none", "doc.doc")]))
+            self.assertEqual(docs[0].raw_obj.Application.Documents.Count, 2)
+            docs.close(constants.wdDoNotSaveChanges)
+
+    def test_bytes(self):
+        """Test transferring documents as bytes.
+
+        `self` is this test case.
+        Open a document from its content and save it back to bytes.
+        Verify that the saved content is a word document and the scratch
+        files are removed after closing the document.
+
+        """
+        with open(join(self._fixture.data_dir, "test.doc"), "rb") as doc_file:
+            data = doc_file.read()
+
+        with Application() as app:
+
+            doc = app.documents.open_from_bytes(data, ".doc")
+            saved_data = doc.save_to_bytes(constants.wdFormatDocument, ".doc")
+            self.assertEqual(saved_data[:4], data[:4])
+            scratch_file = doc.full_name
+            del saved_data
+            doc.close()
+            self.assertFalse(os.path.exists(scratch_file))
+
     def test_context(self):
         """Test context manager features of documents.
 
@@ -235,6 +394,63 @@ class DocTest(TestCase):
                 pass
             doc.close.assert_called_once_with()
 
+    def test_convert(self):
+        """Test caching conversions of identical documents.
+
+        `self` is this test case.
+        Convert two copies of the same document.
+        Verify that only the first one is converted by word.
+
+        """
+        out_dir = self._fixture.out_dir
+        in_files = [join(out_dir, "in{}.doc".format(idx)) for idx in
+                    xrange(2)]
+        out_files = [join(out_dir, "out{}.doc".format(idx)) for idx in
+                     xrange(2)]
+
+        for cur_file in in_files:
+            shutil.copyfile(join(self._fixture.data_dir, "test.doc"),
+                            cur_file)
+
+        conv_cache = ConversionCache(join(out_dir, "cache"), 1 << 26)
+        with Application() as app:
+            hits = [app.documents.convert(
+                cur_in, cur_out, constants.wdFormatDocument,
+                {"active_theme": NO_OBJ}, conv_cache) for cur_in, cur_out in
+                    zip(in_files, out_files)]
+
+        self.assertEqual(hits, [False, True])
+
+        for cur_file in out_files:
+            self.assertTrue(os.path.isfile(cur_file))
+
+    def test_convert_invalid(self):
+        """Test rejecting invalid conversions.
+
+        `self` is this test case.
+        Open a document and convert it.
+        Verify that the conversion is rejected and the document is kept
+        open.
+        Verify that conversions with unknown settings are rejected.
+
+        """
+        in_file = join(self._fixture.data_dir, "test.doc")
+        out_file = join(self._fixture.out_dir, "out.doc")
+        with Application() as app:
+
+            with app.documents.open(in_file):
+
+                self.assertRaises(
+                    ValueError, app.documents.convert, in_file, out_file,
+                    constants.wdFormatDocument)
+                self.assertEqual(len(app.documents), 1)
+
+            self.assertRaises(
+                ValueError, app.documents.convert, in_file, out_file,
+                constants.wdFormatDocument, {"theme": NO_OBJ})
+
+        self.assertFalse(os.path.exists(out_file))
+
     def test_doc_col(self):
         """Test sequence operations on documents.
 
@@ -275,6 +491,75 @@ class DocTest(TestCase):
 
             app.documents.close()
 
+    def test_export(self):
+        """Test exporting document metadata to a columnar table.
+
+        `self` is this test case.
+        Open two documents and export their metadata.
+        Verify that the table rows and column filters match the document
+        snapshots.
+
+        """
+        out_file = join(self._fixture.out_dir, "docs.odct")
+        exporter = Exporter()
+        with Application() as app:
+            with app.documents.open(join(
+                    self._fixture.data_dir, "test.doc")) as doc, \
+                    app.documents.open(join(
+                        self._fixture.data_dir, "a.doc")) as other_doc:
+
+                exporter.add_documents(app.documents)
+                exporter.write(out_file)
+                with Table(out_file) as table:
+
+                    self.assertEqual(len(table), 2)
+                    self.assertEqual(table.get_path(1), other_doc.full_name)
+                    row = table.get_row(0)
+                    self.assertEqual(row[PATH_COL], doc.full_name)
+                    self.assertEqual(
+                        row[TMPL_COL], doc.data.attached_template)
+                    self.assertIn(0, table.select(
+                        THEME_COL, doc.data.active_theme))
+
+    def test_flush_due(self):
+        """Test flushing due saves while idle.
+
+        `self` is this test case.
+        Save a changed document while coalescing saves with an interval.
+        Verify that the save isn't due right away.
+        Wait for the interval and verify that the save is flushed.
+        Revert the change in the document opened for scanning, save it
+        and close it.
+        Verify that the change was saved.
+
+        """
+        test_doc = "test.doc"
+        out_file = join(self._fixture.out_dir, test_doc)
+        interval = 0.5
+        with Application(
+                write_behind=WriteBehindPolicy(interval=interval)) as app:
+
+            doc = app.documents.open(join(self._fixture.data_dir, test_doc))
+            doc.save_as(out_file)
+            self.assertIsNone(app.documents.flush_due())
+            theme = doc.data.active_theme
+            doc.data.active_theme = NO_OBJ
+            doc.save()
+            self.assertGreater(app.documents.flush_due(), 0)
+            time.sleep(interval)
+            self.assertIsNone(app.documents.flush_due())
+            self.assertEqual(doc.raw_obj.ActiveTheme.lower(), NO_OBJ)
+            doc.close()
+
+            with app.documents.open(
+                    out_file, scan=True, ReadOnly=False) as doc:
+
+                doc.data.active_theme = theme
+                doc.save()
+
+            with app.documents.open(out_file, scan=True) as doc:
+                self.assertEqual(doc.data.active_theme, theme)
+
     def test_lang_style(self):
         """Test language writing styles.
 
@@ -296,6 +581,85 @@ class DocTest(TestCase):
                 self.assertEqual(
                     doc.data.active_writing_style[lang.name_local], lang_style)
 
+    def test_many_styles(self):
+        """Test assigning many distinct writing styles.
+
+        `self` is this test case.
+        Load a document and assign more distinct writing styles than a
+        byte can encode.
+        Verify that the last assigned writing style is kept.
+
+        """
+        with Application() as app:
+            with app.documents.open(
+                join(self._fixture.data_dir, "test.doc")) as doc:
+
+                for style_num in xrange(300):
+                    doc.data.active_writing_style = {
+                        constants.wdEnglishUS: "style {}".format(style_num)}
+
+                self.assertEqual(doc.data.active_writing_style[
+                    constants.wdEnglishUS], "style 299")
+
+    def test_max_open(self):
+        """Test limiting the number of documents open in word.
+
+        `self` is this test case.
+        Open two documents while allowing only one to be open in word.
+        Verify that the first document is closed behind the scenes, that
+        its name doesn't reopen it and that it's reopened when used
+        again, closing the second one instead. Verify that every client
+        operation counts as a single hit.
+
+        """
+        data_dir = self._fixture.data_dir
+        with Application(max_open_docs=1) as app:
+
+            docs = app.documents
+            doc = docs.open(join(data_dir, "test.doc"))
+            doc_data = doc.data
+            other_doc = docs.open(join(data_dir, "a.doc"))
+            self.assertIsNotNone(doc.reopen_path)
+            self.assertIsNone(other_doc.reopen_path)
+            self.assertEqual(doc.full_name, join(data_dir, "test.doc").lower())
+            self.assertEqual(doc.name, "test.doc")
+            self.assertEqual(docs.misses, 0)
+            self.assertIsNotNone(doc.raw_obj)
+            self.assertEqual(docs.misses, 1)
+            self.assertIsNone(doc.reopen_path)
+            self.assertIsNotNone(other_doc.reopen_path)
+            self.assertIs(doc.data, doc_data)
+            hits = docs.hits
+            doc.attached_template = doc.attached_template
+            self.assertEqual(docs.hits, hits + 1)
+            docs.close()
+
+    def test_metrics(self):
+        """Test rendering metrics.
+
+        `self` is this test case.
+        Open a document.
+        Verify that the open operation and the open document are
+        reported in the rendered metrics, until quitting the
+        application.
+
+        """
+        with Application() as app:
+            with app.documents.open(join(self._fixture.data_dir, "test.doc")):
+
+                report = metrics.render()
+                self.assertRegexpMatches(
+                    report, r'(?m)^officedom_operation_seconds_count\{'
+                    r'instance="\d+",operation="open"\} [1-9]')
+                self.assertRegexpMatches(
+                    report,
+                    r'(?m)^officedom_open_documents\{instance="\d+"\} 1$')
+                instance = re.search(
+                    r'(?m)^officedom_open_documents\{(instance="\d+")\}',
+                    report).group(1)
+
+        self.assertNotIn(instance, metrics.render())
+
     def test_multi_open(self):
         """Test opening the same document several times.
 
@@ -327,6 +691,295 @@ class DocTest(TestCase):
                 join(self._fixture.data_dir, test_doc)) as doc:
                 self.assertEqual(doc.name, test_doc)
 
+    def test_open_timeout(self):
+        """Test timing out while opening documents.
+
+        `self` is this test case.
+        Open a document with a timeout too short to complete.
+        Verify that the operation times out and that the application can
+        still open the document afterwards.
+
+        """
+        test_doc = "test.doc"
+        in_file = join(self._fixture.data_dir, test_doc)
+        with Application(1e-3, BusyMessageFilter()) as app:
+
+            self.assertRaises(CallTimeoutError, app.documents.open, in_file)
+            app.call_timeout = None
+            with app.documents.open(in_file) as doc:
+                self.assertEqual(app.documents[:], [doc])
+
+    def test_projection(self):
+        """Test loading only some fields of a document.
+
+        `self` is this test case.
+        Open a document loading only its template.
+        Verify that the template is loaded while other fields aren't.
+        Open the document again loading all fields.
+        Verify that both snapshots are different either way and that
+        the partial snapshot adds no changes.
+        Verify that unknown fields are rejected.
+
+        """
+        data_dir = self._fixture.data_dir
+        with Application() as app:
+
+            with app.documents.open(join(data_dir, "test.doc"),
+                                    fields=["attached_template"]) as doc:
+
+                self.assertEqual(
+                    doc.data.attached_template, app.normal_template.full_name)
+                self.assertRaises(
+                    AttributeError, getattr, doc.data, "active_theme")
+                partial_data = doc.data
+
+            with app.documents.open(join(data_dir, "test.doc")) as doc:
+
+                self.assertNotEqual(partial_data, doc.data)
+                self.assertNotEqual(doc.data, partial_data)
+                self.assertEqual(doc.data.diff(partial_data), {})
+
+            self.assertRaises(ValueError, app.documents.open,
+                              join(data_dir, "a.doc"), fields=["theme"])
+
+    def test_recovery(self):
+        """Test recovering from a failed word process.
+
+        `self` is this test case.
+        Change the theme of an open document, then make the word process
+        exit behind the application's back.
+        Verify that the watchdog reports the failure and that the
+        document is reopened in a new process with its change reapplied.
+
+        """
+        test_doc = "test.doc"
+        out_file = join(self._fixture.out_dir, test_doc)
+        shutil.copyfile(join(self._fixture.data_dir, test_doc), out_file)
+        events = []
+        with Application(watchdog=WatchdogPolicy(
+                0.1, on_recover=events.append)) as app:
+
+            doc = app.documents.open(out_file)
+            doc.data.active_theme = NO_OBJ
+            doc.raw_obj.Application.Quit(constants.wdDoNotSaveChanges)
+            time.sleep(1)
+            self.assertIs(app.documents[0], doc)
+            self.assertEqual(len(events), 1)
+            self.assertEqual(events[0].cause, "crashed")
+            self.assertEqual(events[0].recovered, [doc])
+            self.assertEqual(doc.raw_obj.ActiveTheme.lower(), NO_OBJ)
+
+    def test_scan(self):
+        """Test scanning documents.
+
+        `self` is this test case.
+        Scan a document based on a template that isn't loaded.
+        Verify that the document isn't tracked and its template isn't
+        loaded.
+
+        """
+        with Application() as app:
+
+            num_of_tmpls = len(app.templates)
+            with app.documents.open(join(self._fixture.data_dir, "test.dot"),
+                                    fields=["attached_template"],
+                                    scan=True) as doc:
+
+                self.assertTrue(doc.data.attached_template)
+                self.assertEqual(len(app.documents), 0)
+                self.assertEqual(len(app.templates), num_of_tmpls)
+
+            self.assertEqual(len(app.templates), num_of_tmpls)
+
+    def test_search(self):
+        """Test searching the text of open documents.
+
+        `self` is this test case.
+        Open a document while indexing text.
+        Verify that the document is found by a phrase from its text.
+        Close the document and verify that it isn't found anymore.
+        Convert the document and verify that it isn't indexed.
+
+        """
+        with Application(index_text=True) as app:
+
+            in_file = join(self._fixture.data_dir, "test.doc")
+            doc = app.documents.open(in_file)
+            phrase = next(para for para in doc.iter_text(paragraphs=True) if
+                          para.split())
+            text_index = app.documents.text_index
+            self.assertEqual(text_index.search(phrase), [doc])
+            doc.close()
+            self.assertEqual(text_index.search(phrase), [])
+            app.documents.convert(in_file, join(
+                self._fixture.out_dir, "test.doc"), constants.wdFormatDocument)
+            self.assertEqual(len(text_index), 0)
+
+    def test_serialize(self):
+        """Test serializing document snapshots.
+
+        `self` is this test case.
+        Load a document and verify that its snapshot survives binary,
+        JSON, and pickle round trips.
+
+        """
+        test_doc = "test.doc"
+        with Application() as app:
+            with app.documents.open(
+                join(self._fixture.data_dir, test_doc)) as doc:
+
+                self.assertEqual(codec.loads(codec.dumps(doc.data)), doc.data)
+                self.assertEqual(
+                    codec.from_json(codec.to_json(doc.data)), doc.data)
+                self.assertEqual(cPickle.loads(cPickle.dumps(doc.data, 2)),
+                                 doc.data)
+
+    def test_spans(self):
+        """Test tracing document operations.
+
+        `self` is this test case.
+        Open a document with spans written as chrome trace events.
+        Verify that the open span reports the file name and encloses the
+        COM open and the document snapshot loading.
+
+        """
+        in_file = join(self._fixture.data_dir, "test.doc")
+        trace_file = join(self._fixture.out_dir, "trace.json")
+        with ChromeTraceSink(trace_file) as sink:
+            with Application(tracer=Tracer(sink)) as app:
+                app.documents.open(in_file).close()
+
+        with open(trace_file) as trace_stream:
+            events = dict((event["name"], event) for event in
+                          json.load(trace_stream))
+
+        self.assertEqual(events["Documents.open"]["args"],
+                         {"file_name": in_file})
+
+        for name in ["com.open", "Document.load_data"]:
+
+            self.assertGreaterEqual(
+                events[name]["ts"], events["Documents.open"]["ts"])
+            self.assertLessEqual(
+                events[name]["dur"], events["Documents.open"]["dur"])
+
+    def test_text(self):
+        """Test streaming document text.
+
+        `self` is this test case.
+        Read a document text in small chunks and in paragraphs.
+        Verify that the chunks and paragraphs match the document
+        content.
+
+        """
+        with Application() as app:
+            with app.documents.open(
+                    join(self._fixture.data_dir, "test.doc")) as doc:
+
+                content = doc.raw_obj.Content
+                self.assertEqual(
+                    u"".join(doc.iter_text(16)), content.Text)
+                self.assertEqual(len(list(doc.iter_text(16, True))),
+                                 content.Paragraphs.Count)
+
+    def test_theme_catalog(self):
+        """Test validating themes against the theme catalog.
+
+        `self` is this test case.
+        Load a document and reassign its theme in upper case, then
+        assign an unknown theme.
+        Verify that the theme is resolved case-insensitively and that
+        the unknown theme is rejected.
+
+        """
+        with Application() as app:
+            with app.documents.open(
+                    join(self._fixture.data_dir, "test.doc")) as doc:
+
+                theme = doc.data.active_theme
+                self.assertIn(theme, app.themes)
+                doc.data.active_theme = theme.upper()
+                self.assertEqual(doc.data.active_theme, theme)
+                self.assertRaises(ValueError, setattr, doc.data,
+                                  "active_theme", "no such theme")
+
+    def test_write_behind(self):
+        """Test coalescing document saves.
+
+        `self` is this test case.
+        Save a changed document while coalescing saves.
+        Verify that the document isn't updated until it's closed.
+        Open the document again and verify that the change was saved.
+
+        """
+        test_doc = "test.doc"
+        out_file = join(self._fixture.out_dir, test_doc)
+        with Application(write_behind=WriteBehindPolicy()) as app:
+
+            doc = app.documents.open(join(self._fixture.data_dir, test_doc))
+            doc.save_as(out_file)
+            doc.data.active_theme = NO_OBJ
+            doc.save()
+            doc.save()
+            self.assertNotEqual(doc.raw_obj.ActiveTheme.lower(), NO_OBJ)
+            doc.close()
+            with app.documents.open(out_file) as doc:
+                self.assertEqual(doc.data.active_theme, NO_OBJ)
+
+    def test_writing_styles(self):
+        """Test sharing writing style storage among documents.
+
+        `self` is this test case.
+        Open two documents.
+        Verify that equal writing styles are stored only once and can't
+        be modified in place.
+
+        """
+        with Application() as app:
+            with app.documents.open(join(
+                    self._fixture.data_dir, "test.doc")) as doc, \
+                    app.documents.open(join(
+                        self._fixture.data_dir, "test.dot")) as tmpl_doc:
+
+                styles = doc.data.active_writing_style
+                tmpl_styles = tmpl_doc.data.active_writing_style
+                self.assertTrue(styles)
+
+                for lang in set(styles).intersection(tmpl_styles):
+                    if styles[lang] == tmpl_styles[lang]:
+                        self.assertIs(styles[lang], tmpl_styles[lang])
+
+                lang = iter(styles).next()
+                self.assertRaises(TypeError, styles.__setitem__, lang, "")
+
+
+class RecycleTest(TestCase):
+
+    """Test case for recycling word processes"""
+
+    def test(self):
+        """Test restarting the word process after serving documents.
+
+        `self` is this test case.
+        Add and close a document with a policy of recycling after one
+        document.
+        Verify that the closed document and the templates of the old
+        process are released and that the application keeps working
+        with a new process.
+
+        """
+        with Application(recycle=RecyclePolicy(1)) as app:
+
+            old_tmpl = app.normal_template
+            doc = app.documents.add()
+            self.assertEqual(app.normal_template, old_tmpl)
+            doc.close()
+            self.assertIsNone(doc.raw_obj)
+            self.assertNotEqual(app.normal_template, old_tmpl)
+            self.assertIsNone(old_tmpl.raw_obj)
+            with app.documents.add():
+                self.assertEqual(len(app.documents), 1)
+
 
 class TmplChangeTest(TestCase):
 
@@ -394,6 +1047,36 @@ class TmplChangeTest(TestCase):
                 self.assertEqual(
                 app.templates[doc.attached_template].data, tmpl_data)
 
+    def test_auto_txt_index(self):
+        """Test updating the autoText index upon saving templates.
+
+        `self` is this test case.
+        Load a template, rename one of its autoText entries, and then
+        save the template.
+        Verify that look-ups reflect the renamed entry.
+
+        """
+        test_tmpl = "test.dot"
+        out_tmpl = join(self._fixture.out_dir, test_tmpl)
+        shutil.copy(join(self._fixture.data_dir, test_tmpl), out_tmpl)
+        old_entry = "hello"
+        new_entry = "Hi there"
+        with Application() as app:
+            with app.documents.open(
+                out_tmpl, Format=constants.wdOpenFormatTemplate) as doc:
+
+                tmpl = app.templates[doc.attached_template]
+                tmpl.data.auto_text_entries[new_entry] = \
+                    tmpl.data.auto_text_entries.pop(old_entry)
+                # The index reflects saved entries only.
+                self.assertFalse(app.templates.find_auto_text(new_entry))
+                tmpl.save()
+                self.assertFalse(app.templates.find_auto_text(old_entry))
+                self.assertEqual(
+                    [entry for entry in app.templates.find_auto_text(
+                        "hi", True, True) if entry[0] == tmpl],
+                    [(tmpl, new_entry)])
+
 
 class TmplTest(TestCase):
 
@@ -440,6 +1123,114 @@ class TmplTest(TestCase):
                 xml.etree.ElementTree.fromstring(pyxser.serialize(
                     app.normal_template.data, encoding)).find(objref_path))
 
+    def test_auto_txt_delta(self):
+        """Test diffing autoText entries.
+
+        `self` is this test case.
+        Diff the normal template snapshot against a copy with changed
+        autoText entries.
+        Verify that the delta holds only the entry changes and that
+        applying it to a copy reproduces the changed snapshot.
+
+        """
+        new_entry = "See you!"
+        with Application() as app:
+
+            tmpl_data = app.normal_template.data
+            new_data = codec.loads(codec.dumps(tmpl_data))
+            new_data.auto_text_entries[new_entry] = "bye"
+            delta = tmpl_data.diff(new_data)
+            self.assertEqual(delta["auto_text_entries"].changed,
+                             {new_entry: "bye"})
+            self.assertFalse(delta["auto_text_entries"].removed)
+            patched_data = codec.loads(codec.dumps(tmpl_data))
+            patched_data.apply_delta(delta)
+            self.assertEqual(patched_data, new_data)
+
+    def test_auto_txt_lookup(self):
+        """Test looking up autoText entries across templates.
+
+        `self` is this test case.
+        Load a template and verify exact, prefix, and case-insensitive
+        look-ups of its autoText entries.
+        Close the template and verify that its entries are no longer
+        found.
+
+        """
+        test_tmpl = "test.dot"
+        with Application() as app:
+
+            with app.documents.open(
+                join(self._fixture.data_dir, test_tmpl),
+                Format=constants.wdOpenFormatTemplate) as doc:
+
+                tmpl = app.templates[doc.attached_template]
+                self.assertEqual(app.templates.find_auto_text("hello"),
+                                 [(tmpl, "hello")])
+                self.assertFalse(app.templates.find_auto_text("Hello"))
+                self.assertEqual(app.templates.find_auto_text(
+                    "Hello", ignore_case=True), [(tmpl, "hello")])
+                self.assertEqual(
+                    [entry for entry in app.templates.find_auto_text(
+                        "g", True) if entry[0] == tmpl],
+                    [(tmpl, "good morning"), (tmpl, "greetings")])
+
+            self.assertFalse(
+                [entry for entry in app.templates.find_auto_text("", True)
+                 if entry[0] == tmpl])
+
+    def test_concurrent_load(self):
+        """Test taking template snapshots concurrently upon startup.
+
+        `self` is this test case.
+        Start an application loading template snapshots in worker
+        threads.
+        Verify that the snapshots and the autoText index match those
+        taken on the calling thread.
+
+        """
+        with Application() as app:
+            entries = app.normal_template.data.auto_text_entries
+            matches = [entry for _, entry in
+                       app.templates.find_auto_text("", True)]
+
+        with Application(template_workers=2) as app:
+
+            self.assertEqual(
+                app.normal_template.data.auto_text_entries, entries)
+            self.assertEqual([entry for _, entry in
+                              app.templates.find_auto_text("", True)],
+                             matches)
+
+    def test_deferred_refresh(self):
+        """Test deferring template refreshes.
+
+        `self` is this test case.
+        Associate a new template to several documents within a deferred
+        template refresh context.
+        Verify that the template collection is updated only upon leaving
+        the context.
+
+        """
+        tmpl = "Elegant Letter.dot"
+        with Application() as app:
+
+            docs = [app.documents.add() for _ in range(3)]
+            with app.documents.deferred_template_refresh():
+
+                for doc in docs:
+                    doc.attached_template = tmpl
+
+                self.assertEqual(len(app.templates), 1)
+
+            self.assertEqual(len(app.templates), 2)
+            with app.documents.deferred_template_refresh():
+
+                app.documents.close(constants.wdDoNotSaveChanges)
+                self.assertEqual(len(app.templates), 2)
+
+            self.assertEqual(len(app.templates), 1)
+
     def test_doc_rel(self):
         """Verify that relations between documents and templates.
 
@@ -515,6 +1306,28 @@ class TmplTest(TestCase):
         with Application() as app:
             self.assertIn(app.normal_template, app.templates)
 
+    def test_serialize(self):
+        """Test serializing template snapshots.
+
+        `self` is this test case.
+        Verify that the normal template snapshot survives binary, JSON,
+        and pickle round trips, even with an autoText entry named like
+        the JSON key of dictionaries with non-string keys.
+
+        """
+        with Application() as app:
+
+            tmpl_data = app.normal_template.data
+            self.assertEqual(codec.loads(codec.dumps(tmpl_data)), tmpl_data)
+            self.assertEqual(
+                codec.from_json(codec.to_json(tmpl_data)), tmpl_data)
+            self.assertEqual(
+                cPickle.loads(cPickle.dumps(tmpl_data, 2)), tmpl_data)
+            tmpl_data = cPickle.loads(cPickle.dumps(tmpl_data, 2))
+            tmpl_data.auto_text_entries = {"__items__": "entry"}
+            self.assertEqual(
+                codec.from_json(codec.to_json(tmpl_data)), tmpl_data)
+
     def test_tmpl_col(self):
         """Test sequence operations on template.
 